@@ -0,0 +1,77 @@
+"""
+Write coalescing for the ingest hot path.
+
+Each single-row ingest would otherwise pay for its own COMMIT (and fsync).
+`IngestBatcher` collects rows submitted by concurrent requests for a short
+window and writes them with one executemany + COMMIT, then hands each
+caller back its own RETURNING row.
+"""
+
+import asyncio
+
+
+class IngestBatcher:
+    """
+    Coalesces concurrent single-row inserts into one transaction.
+
+    A batch is flushed when `max_rows` rows are pending or `max_delay`
+    seconds have passed since the first one arrived, whichever comes first.
+    `statement` must be an INSERT ... RETURNING with
+    `sort_by_parameter_order=True` so results line up with submissions.
+    """
+
+    def __init__(self, statement, session_factory, max_rows: int = 200, max_delay: float = 0.01):
+        self.statement = statement
+        self.session_factory = session_factory
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self._queue: asyncio.Queue[tuple[dict, asyncio.Future]] = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def submit(self, row: dict) -> tuple:
+        """Queue a row for insertion and wait for its RETURNING values."""
+        self.start()
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, fut))
+        return await fut
+
+    async def _collect(self) -> list[tuple[dict, asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_delay
+        while len(batch) < self.max_rows:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        async with self.session_factory() as db:
+            while True:
+                batch = await self._collect()
+                try:
+                    result = await db.execute(self.statement, [row for row, _ in batch])
+                    returned = result.all()
+                    await db.commit()
+                except Exception as e:
+                    for _, fut in batch:
+                        if not fut.done():
+                            fut.set_exception(e)
+                    await db.rollback()
+                    continue
+                for (_, fut), ret in zip(batch, returned):
+                    if not fut.done():
+                        fut.set_result(tuple(ret))
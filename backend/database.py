@@ -1,30 +1,125 @@
 import os
+import asyncio
+import logging
+from typing import Annotated
+from fastapi import Depends
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 
+logger = logging.getLogger(__name__)
+
 # Use SQLite for local testing if DATABASE_URL is not set
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./market_db.sqlite")
 
-engine = create_async_engine(DATABASE_URL, echo=False)
+def _is_memory_sqlite(url: str) -> bool:
+    parsed = make_url(url)
+    db_path = parsed.database
+    return parsed.get_backend_name() == "sqlite" and (
+        not db_path or db_path == ":memory:" or parsed.query.get("mode") == "memory"
+    )
+
+
+def _pool_kwargs(url: str, pool_size: int, max_overflow: int) -> dict:
+    """Pool sizing for create_async_engine; in-memory SQLite uses StaticPool, which takes none."""
+    if _is_memory_sqlite(url):
+        return {}
+    return {"pool_size": pool_size, "max_overflow": max_overflow}
+
+
+# Keep a warm pool of connections instead of opening one per request
+engine = create_async_engine(
+    DATABASE_URL,
+    echo=False,
+    pool_pre_ping=False,
+    **_pool_kwargs(DATABASE_URL, pool_size=10, max_overflow=20),
+)
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+IS_SQLITE = "sqlite" in DATABASE_URL
+WAL_CHECKPOINT_INTERVAL = 300  # 5 minutes
+
+
+def _read_only_url(url: str) -> str | None:
+    """URI-mode read-only URL for a file-backed SQLite database, else None."""
+    db_path = make_url(url).database
+    if _is_memory_sqlite(url) or db_path.startswith("file:"):
+        return None
+    return f"sqlite+aiosqlite:///file:{db_path}?mode=ro&uri=true"
+
+
+# GET endpoints read through a separate read-only pool so they never take
+# write locks; on non-SQLite databases both names point at the same engine
+READ_DATABASE_URL = _read_only_url(DATABASE_URL) if IS_SQLITE else None
+if READ_DATABASE_URL:
+    read_engine = create_async_engine(
+        READ_DATABASE_URL,
+        echo=False,
+        pool_pre_ping=False,
+        **_pool_kwargs(READ_DATABASE_URL, pool_size=20, max_overflow=20),
+    )
+else:
+    read_engine = engine
+ReadSessionLocal = sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+
 # Enable WAL mode for SQLite to handle concurrent writes
-if "sqlite" in DATABASE_URL:
+if IS_SQLITE:
     from sqlalchemy import event
+
+    def _tune_sqlite_reads(cursor):
+        cursor.execute("PRAGMA busy_timeout=30000")       # wait on locks instead of SQLITE_BUSY
+        cursor.execute("PRAGMA cache_size=-64000")        # 64MB page cache
+        cursor.execute("PRAGMA mmap_size=268435456")      # 256MB memory-mapped I/O
+        cursor.execute("PRAGMA temp_store=MEMORY")        # sorter / temp tables in RAM
+
     @event.listens_for(engine.sync_engine, "connect")
     def set_sqlite_pragma(dbapi_connection, connection_record):
         cursor = dbapi_connection.cursor()
         cursor.execute("PRAGMA journal_mode=WAL")
         cursor.execute("PRAGMA synchronous=NORMAL")
+        _tune_sqlite_reads(cursor)
+        cursor.execute("PRAGMA wal_autocheckpoint=1000")
         cursor.close()
 
+    if read_engine is not engine:
+        @event.listens_for(read_engine.sync_engine, "connect")
+        def set_sqlite_read_pragma(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA query_only=1")
+            _tune_sqlite_reads(cursor)
+            cursor.close()
+
 Base = declarative_base()
 
 async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
 
+async def get_ro_db():
+    async with ReadSessionLocal() as session:
+        yield session
+
+DBSession = Annotated[AsyncSession, Depends(get_db)]
+ReadDBSession = Annotated[AsyncSession, Depends(get_ro_db)]
+
+def _create_missing_indexes(sync_conn):
+    # create_all skips tables that already exist, so add new indexes explicitly
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
-        
\ No newline at end of file
+        await conn.run_sync(_create_missing_indexes)
+
+async def periodic_wal_checkpoint():
+    """Checkpoint the SQLite WAL every 5 minutes so it doesn't grow unbounded."""
+    while True:
+        await asyncio.sleep(WAL_CHECKPOINT_INTERVAL)
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("PRAGMA wal_checkpoint(PASSIVE)"))
+        except Exception as e:
+            logger.warning("WAL checkpoint error: %s", e)
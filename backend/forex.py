@@ -3,13 +3,21 @@ TradeSentient — Forex Conversion Utility
 
 Fetches and caches the USD→INR exchange rate using multiple free APIs.
 Redis cache with 15-minute TTL to avoid rate limits.
+
+`get_usd_inr_rate` is the blocking version used by the workers;
+`get_usd_inr_rate_async` is the non-blocking version for API handlers.
 """
 
 import os
 import json
-import requests
+import asyncio
+import logging
+import httpx
+import threading
 import time
 
+logger = logging.getLogger(__name__)
+
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
 FOREX_CACHE_KEY = "forex:usd_inr"
 FOREX_TTL = 900  # 15 minutes
@@ -17,70 +25,107 @@ FOREX_TTL = 900  # 15 minutes
 # Fallback rate if all APIs fail (updated periodically)
 FALLBACK_USD_INR = 83.50
 
-# In-memory cache for when Redis is unavailable
-_mem_cache = {"rate": None, "expires": 0}
+# In-memory front cache, checked before Redis (expiry on the monotonic clock)
+_mem_cache = {"rate": None, "expires": 0.0}
+
+# Shared Redis client (lazily created, reused across calls)
+_redis_client = None
+_redis_lock = threading.Lock()
+
+# Pooled keep-alive HTTP/2 client shared by both forex APIs
+_HTTP_HEADERS = {"User-Agent": "TradeSentient/4.0"}
+_HTTP = httpx.Client(
+    http2=True,
+    timeout=httpx.Timeout(10.0),
+    headers=_HTTP_HEADERS,
+    limits=httpx.Limits(max_keepalive_connections=4),
+)
+
+# Async counterparts for the API process (lazily created on first use)
+_async_redis = None
+_async_http: httpx.AsyncClient | None = None
+_fetch_lock = asyncio.Lock()
 
 
 def _fetch_from_exchangerate_api() -> float | None:
     """Primary: exchangerate-api.com (free, no key required)."""
     try:
-        resp = requests.get(
-            "https://open.er-api.com/v6/latest/USD",
-            timeout=10,
-        )
+        resp = _HTTP.get("https://open.er-api.com/v6/latest/USD")
         resp.raise_for_status()
         data = resp.json()
         if data.get("result") == "success":
             return float(data["rates"]["INR"])
     except Exception as e:
-        print(f"  ⚠ exchangerate-api error: {e}")
+        logger.warning("exchangerate-api error: %s", e)
     return None
 
 
 def _fetch_from_frankfurter() -> float | None:
     """Backup: Frankfurter API (ECB rates, free, no key)."""
     try:
-        resp = requests.get(
-            "https://api.frankfurter.app/latest?from=USD&to=INR",
-            timeout=10,
-        )
+        resp = _HTTP.get("https://api.frankfurter.app/latest?from=USD&to=INR")
         resp.raise_for_status()
         data = resp.json()
         return float(data["rates"]["INR"])
     except Exception as e:
-        print(f"  ⚠ frankfurter error: {e}")
+        logger.warning("frankfurter error: %s", e)
     return None
 
 
 def _get_redis():
-    """Get Redis client, or None if unavailable."""
-    try:
-        import redis
-        r = redis.from_url(REDIS_URL, decode_responses=True, socket_timeout=1, socket_connect_timeout=1)
-        r.ping()
-        return r
-    except Exception:
-        return None
+    """Get the shared Redis client, or None if the redis package is unavailable."""
+    global _redis_client
+    if _redis_client is not None:
+        return _redis_client
+    with _redis_lock:
+        if _redis_client is None:
+            try:
+                import redis
+                pool = redis.ConnectionPool.from_url(
+                    REDIS_URL,
+                    max_connections=16,
+                    decode_responses=True,
+                    socket_timeout=1,
+                    socket_connect_timeout=1,
+                )
+                _redis_client = redis.Redis(connection_pool=pool)
+            except Exception:
+                return None
+    return _redis_client
+
+
+def _drop_redis():
+    """Forget the shared client so the next call reconnects."""
+    global _redis_client
+    _redis_client = None
+
+
+def _remember(rate: float):
+    _mem_cache["rate"] = rate
+    _mem_cache["expires"] = time.monotonic() + FOREX_TTL
 
 
 def get_usd_inr_rate() -> float:
     """
     Get the current USD→INR exchange rate.
-    Priority: Redis cache → API → in-memory cache → fallback constant.
+    Priority: in-memory cache → Redis cache → API → fallback constant.
     """
-    # 1. Try Redis cache
+    # 1. Try in-memory cache
+    if _mem_cache["rate"] and time.monotonic() < _mem_cache["expires"]:
+        return _mem_cache["rate"]
+
+    # 2. Try Redis cache
     r = _get_redis()
     if r:
         try:
             cached = r.get(FOREX_CACHE_KEY)
             if cached:
-                return float(cached)
+                rate = float(cached)
+                _remember(rate)
+                return rate
         except Exception:
-            pass
-
-    # 2. Try in-memory cache
-    if _mem_cache["rate"] and time.time() < _mem_cache["expires"]:
-        return _mem_cache["rate"]
+            _drop_redis()
+            r = None
 
     # 3. Fetch from APIs
     rate = _fetch_from_exchangerate_api()
@@ -88,7 +133,7 @@ def get_usd_inr_rate() -> float:
         rate = _fetch_from_frankfurter()
     if rate is None:
         rate = FALLBACK_USD_INR
-        print(f"  ⚠ Using fallback USD/INR rate: {rate}")
+        logger.warning("Using fallback USD/INR rate: %s", rate)
 
     # 4. Cache in Redis + memory
     if r:
@@ -96,13 +141,110 @@ def get_usd_inr_rate() -> float:
             r.setex(FOREX_CACHE_KEY, FOREX_TTL, str(rate))
         except Exception:
             pass
-    _mem_cache["rate"] = rate
-    _mem_cache["expires"] = time.time() + FOREX_TTL
+    _remember(rate)
 
     return rate
 
 
-def convert_to_inr(value_usd: float) -> float:
-    """Convert a USD value to INR using the cached exchange rate."""
-    rate = get_usd_inr_rate()
+def _get_async_http() -> httpx.AsyncClient:
+    global _async_http
+    if _async_http is None:
+        _async_http = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(10.0),
+            headers=_HTTP_HEADERS,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=4),
+        )
+    return _async_http
+
+
+def _get_async_redis():
+    """Get the shared async Redis client, or None if unavailable."""
+    global _async_redis
+    if _async_redis is None:
+        try:
+            import redis.asyncio as aioredis
+            _async_redis = aioredis.from_url(
+                REDIS_URL, decode_responses=True, socket_timeout=1, socket_connect_timeout=1,
+                max_connections=16,
+            )
+        except Exception:
+            return None
+    return _async_redis
+
+
+async def _fetch_from_exchangerate_api_async() -> float | None:
+    """Primary: exchangerate-api.com (non-blocking)."""
+    try:
+        resp = await _get_async_http().get("https://open.er-api.com/v6/latest/USD")
+        resp.raise_for_status()
+        data = resp.json()
+        if data.get("result") == "success":
+            return float(data["rates"]["INR"])
+    except Exception as e:
+        logger.warning("exchangerate-api error: %s", e)
+    return None
+
+
+async def _fetch_from_frankfurter_async() -> float | None:
+    """Backup: Frankfurter API (non-blocking)."""
+    try:
+        resp = await _get_async_http().get("https://api.frankfurter.app/latest?from=USD&to=INR")
+        resp.raise_for_status()
+        data = resp.json()
+        return float(data["rates"]["INR"])
+    except Exception as e:
+        logger.warning("frankfurter error: %s", e)
+    return None
+
+
+async def get_usd_inr_rate_async() -> float:
+    """
+    Non-blocking variant of `get_usd_inr_rate` for use inside the event loop.
+    Concurrent cache misses share a single upstream fetch.
+    """
+    global _async_redis
+    if _mem_cache["rate"] and time.monotonic() < _mem_cache["expires"]:
+        return _mem_cache["rate"]
+
+    async with _fetch_lock:
+        # Another coroutine may have filled the cache while we waited
+        if _mem_cache["rate"] and time.monotonic() < _mem_cache["expires"]:
+            return _mem_cache["rate"]
+
+        r = _get_async_redis()
+        if r:
+            try:
+                cached = await r.get(FOREX_CACHE_KEY)
+                if cached:
+                    rate = float(cached)
+                    _remember(rate)
+                    return rate
+            except Exception:
+                _async_redis = None
+                r = None
+
+        rate = await _fetch_from_exchangerate_api_async()
+        if rate is None:
+            rate = await _fetch_from_frankfurter_async()
+        if rate is None:
+            rate = FALLBACK_USD_INR
+            logger.warning("Using fallback USD/INR rate: %s", rate)
+
+        if r:
+            try:
+                await r.setex(FOREX_CACHE_KEY, FOREX_TTL, str(rate))
+            except Exception:
+                pass
+        _remember(rate)
+        return rate
+
+
+def convert_to_inr(value_usd: float, rate: float | None = None) -> float:
+    """
+    Convert a USD value to INR using the cached exchange rate.
+    Pass `rate` (from get_usd_inr_rate) when converting many values at once.
+    """
+    if rate is None:
+        rate = get_usd_inr_rate()
     return round(value_usd * rate, 2)
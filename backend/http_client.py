@@ -0,0 +1,37 @@
+"""
+Shared outbound HTTP session.
+
+One keep-alive `requests.Session` per process so repeated calls to the same
+host (CoinGecko, Wikipedia, ...) reuse TCP + TLS connections instead of
+handshaking on every request. Idempotent requests are retried on transient
+gateway errors.
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+USER_AGENT = "TradeSentient/3.0"
+
+
+def make_session(pool_connections: int = 4, pool_maxsize: int = 8, retries: int = 2) -> requests.Session:
+    """Build a pooled session with the default headers and retry policy."""
+    session = requests.Session()
+    session.headers.update({"User-Agent": USER_AGENT})
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(
+            total=retries,
+            backoff_factor=0.2,
+            status_forcelist=(502, 503, 504),
+            raise_on_status=False,  # hand the last response back to the caller
+        ),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# Process-wide session for ticker / market data fetches
+session = make_session()
@@ -1,26 +1,40 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, HTTPException, Query, Request
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from fastapi.responses import ORJSONResponse, Response
+from sqlalchemy import select, insert
 from typing import List, Optional
-import json
+from pydantic import ValidationError
+import orjson
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import redis.asyncio as redis
-from backend.database import get_db, init_db
+from backend.database import DBSession, ReadDBSession, init_db, AsyncSessionLocal, IS_SQLITE, periodic_wal_checkpoint
 from backend.models import MarketPrice, SentimentLog, TradeSignal
 from backend import schemas
 from backend.signals import SignalEngine
-from backend.ticker_config import ASSET_CLASSES, get_cached_tickers, refresh_all_tickers, get_asset_class, get_ticker_info
-from backend.forex import get_usd_inr_rate
+from backend.batching import IngestBatcher
+from backend.ticker_config import (
+    ASSET_CLASSES, get_cached_tickers, refresh_all_tickers, get_asset_class, get_ticker_info, tickers_version,
+)
+from backend.forex import get_usd_inr_rate_async
 from backend.security import (
     limiter,
+    rate_limit,
+    RateLimitHit,
+    init_rate_limit_redis,
     rate_limit_error_handler,
     SecurityHeadersMiddleware,
     RequestSizeLimitMiddleware,
     get_allowed_origins,
 )
 from slowapi.errors import RateLimitExceeded
+import logging
+import logging.handlers
 import os
+import queue
+import sys
+
+logger = logging.getLogger(__name__)
 
 # ═══════════════════════════════════════════════════════
 #  FastAPI App Initialization with Security
@@ -32,13 +46,18 @@ app = FastAPI(
     description="Real-time market intelligence API with security hardening",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
 )
 
 # Add rate limiter state
 app.state.limiter = limiter
 
-# Add rate limit error handler
+# Add rate limit error handlers
 app.add_exception_handler(RateLimitExceeded, rate_limit_error_handler)
+app.add_exception_handler(RateLimitHit, rate_limit_error_handler)
+
+PUBLIC_RATE_LIMIT = rate_limit(100)    # Public endpoints: 100 req/min per IP
+INGEST_RATE_LIMIT = rate_limit(1000)   # Ingestion endpoints: 1000 req/min for worker
 
 # Add security headers middleware (OWASP best practices)
 app.add_middleware(SecurityHeadersMiddleware)
@@ -59,6 +78,29 @@ app.add_middleware(
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
 signal_engine = SignalEngine(short_window=10, long_window=30)
 
+# Insert statements built once at import; SQLAlchemy caches their compiled
+# form, and RETURNING rows come back in parameter order for executemany
+_MP_INSERT = insert(MarketPrice).returning(MarketPrice.id, MarketPrice.timestamp, sort_by_parameter_order=True)
+_SL_INSERT = insert(SentimentLog).returning(SentimentLog.id, SentimentLog.timestamp, sort_by_parameter_order=True)
+_SIG_INSERT = insert(TradeSignal).returning(TradeSignal.timestamp, sort_by_parameter_order=True)
+
+# Concurrent single-row ingests share one COMMIT
+_market_batcher = IngestBatcher(_MP_INSERT, AsyncSessionLocal)
+_sentiment_batcher = IngestBatcher(_SL_INSERT, AsyncSessionLocal)
+
+# Price ticks waiting for the signal worker: (symbol, price, asset_class)
+SIGNAL_BATCH_SIZE = 200
+_signal_queue: asyncio.Queue[tuple[str, float, str | None]] = asyncio.Queue(maxsize=10_000)
+_signal_task: asyncio.Task | None = None
+
+# Dedicated threads for ticker refresh (kept off the default executor)
+_ticker_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="tkrefresh")
+_refresh_inflight: asyncio.Future | None = None
+
+# Pre-serialized /tickers body, rebuilt after a ticker refresh here or in Redis
+_tickers_version = 1
+_tickers_cache: tuple[tuple[int, int] | None, bytes] = (None, b"")
+
 
 # ═══════════════════════════════════════════════════════
 #  WebSocket Connection Manager
@@ -66,41 +108,70 @@ signal_engine = SignalEngine(short_window=10, long_window=30)
 
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        self.active_connections: set[WebSocket] = set()
         self.subscriptions: dict[WebSocket, set[str] | None] = {}
+        # Inverted index: symbol -> subscribed sockets, plus wildcard subscribers
+        self.by_symbol: dict[str, set[WebSocket]] = {}
+        self.firehose: set[WebSocket] = set()
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.active_connections.add(websocket)
         self.subscriptions[websocket] = None
+        self.firehose.add(websocket)
+
+    def _unindex(self, websocket: WebSocket):
+        self.firehose.discard(websocket)
+        for symbol in self.subscriptions.get(websocket) or ():
+            conns = self.by_symbol.get(symbol)
+            if conns is not None:
+                conns.discard(websocket)
+                if not conns:
+                    del self.by_symbol[symbol]
 
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+        self._unindex(websocket)
+        self.active_connections.discard(websocket)
         self.subscriptions.pop(websocket, None)
 
     def subscribe(self, websocket: WebSocket, symbols: list[str]):
+        self._unindex(websocket)
         self.subscriptions[websocket] = set(symbols)
+        for symbol in self.subscriptions[websocket]:
+            self.by_symbol.setdefault(symbol, set()).add(websocket)
 
     def subscribe_add(self, websocket: WebSocket, symbol: str):
         if self.subscriptions.get(websocket) is None:
+            self.firehose.discard(websocket)
             self.subscriptions[websocket] = set()
         self.subscriptions[websocket].add(symbol)
+        self.by_symbol.setdefault(symbol, set()).add(websocket)
+
+    def subscribe_all(self, websocket: WebSocket):
+        self._unindex(websocket)
+        self.subscriptions[websocket] = None
+        self.firehose.add(websocket)
 
     async def broadcast(self, message: str, symbol: str | None = None):
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                subs = self.subscriptions.get(connection)
-                if subs is None or symbol is None or symbol in subs:
-                    await connection.send_text(message)
-            except Exception:
-                disconnected.append(connection)
-        for conn in disconnected:
-            self.disconnect(conn)
+        if symbol is None:
+            targets = list(self.active_connections)
+        else:
+            targets = list(self.by_symbol.get(symbol, set()) | self.firehose)
+        if not targets:
+            return
+        # Build the ASGI send event once and share it across every client
+        event = {"type": "websocket.send", "text": message}
+        results = await asyncio.gather(
+            *(connection.send(event) for connection in targets),
+            return_exceptions=True,
+        )
+        for connection, result in zip(targets, results):
+            if isinstance(result, Exception):
+                self.disconnect(connection)
 
 
 manager = ConnectionManager()
+_log_listener: logging.handlers.QueueListener | None = None
 use_redis = False
 redis_client = None
 
@@ -111,46 +182,93 @@ async def check_redis():
         redis_client = redis.from_url(REDIS_URL, decode_responses=True)
         await redis_client.ping()
         use_redis = True
-        print("✓ Connected to Redis")
+        init_rate_limit_redis(redis_client)
+        logger.info("Connected to Redis")
     except Exception as e:
         use_redis = False
-        print(f"✗ Redis unavailable ({e}), using in-memory broadcast")
+        logger.warning("Redis unavailable (%s), using in-memory broadcast", e)
+
+
+def setup_logging(level: int = logging.INFO):
+    """
+    Route log records through a queue so the event loop never blocks on
+    stderr; a background QueueListener thread does the actual writes.
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    stream = logging.StreamHandler(sys.stderr)
+    stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    _log_listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    _log_listener.start()
+    root = logging.getLogger()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+    logging.getLogger("httpx").setLevel(logging.WARNING)  # per-request lines are noise
 
 
 @app.on_event("startup")
 async def startup_event():
-    print("→ Starting up TradeSentient Backend...")
+    setup_logging()
+    logger.info("Starting up TradeSentient Backend...")
     try:
         await init_db()
-        print("  ✓ Database initialized")
+        logger.info("Database initialized")
     except Exception as e:
-        print(f"  ✗ Database init failed: {e}")
+        logger.error("Database init failed: %s", e)
+    if IS_SQLITE:
+        asyncio.create_task(periodic_wal_checkpoint())
 
     await check_redis()
     if use_redis:
         asyncio.create_task(redis_listener())
 
     # Refresh ticker caches on startup (runs in thread to avoid blocking)
-    try:
-        print("→ Triggering initial ticker refresh...")
-        asyncio.get_event_loop().run_in_executor(None, refresh_all_tickers)
-    except Exception as e:
-        print(f"  ✗ Ticker refresh failed: {e}")
+    logger.info("Triggering initial ticker refresh...")
+    asyncio.create_task(refresh_tickers())
 
     # Schedule periodic refresh every 15 minutes
     asyncio.create_task(periodic_ticker_refresh())
-    print("✓ Startup complete")
+
+    start_signal_worker()
+    logger.info("Startup complete")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
+
+async def refresh_tickers():
+    """
+    Refresh ticker caches in a thread and invalidate the /tickers body.
+    Overlapping calls wait on the refresh already in flight.
+    """
+    global _tickers_version, _refresh_inflight
+    if _refresh_inflight is not None:
+        await asyncio.wait([_refresh_inflight])
+        return
+
+    _refresh_inflight = asyncio.get_running_loop().run_in_executor(_ticker_pool, refresh_all_tickers)
+    try:
+        await _refresh_inflight
+        _tickers_version += 1
+        logger.info("Ticker caches refreshed")
+    except Exception as e:
+        logger.error("Ticker refresh error: %s", e)
+    finally:
+        _refresh_inflight = None
 
 
 async def periodic_ticker_refresh():
     """Refresh ticker caches every 15 minutes."""
     while True:
         await asyncio.sleep(900)  # 15 minutes
-        try:
-            await asyncio.get_event_loop().run_in_executor(None, refresh_all_tickers)
-            print("✓ Ticker caches refreshed")
-        except Exception as e:
-            print(f"✗ Ticker refresh error: {e}")
+        await refresh_tickers()
 
 
 async def redis_listener():
@@ -160,23 +278,114 @@ async def redis_listener():
         async for message in pubsub.listen():
             if message["type"] == "message":
                 try:
-                    data = json.loads(message["data"])
+                    data = orjson.loads(message["data"])
                     symbol = data.get("symbol")
                     await manager.broadcast(message["data"], symbol=symbol)
                 except Exception:
                     await manager.broadcast(message["data"])
     except Exception as e:
-        print(f"Redis listener error: {e}")
+        logger.error("Redis listener error: %s", e)
 
 
-async def publish_update(channel: str, message: str, symbol: str | None = None):
+async def publish_update(channel: str, message: bytes, symbol: str | None = None):
     try:
         if use_redis and redis_client:
             await redis_client.publish(channel, message)
         else:
-            await manager.broadcast(message, symbol=symbol)
+            await manager.broadcast(message.decode(), symbol=symbol)
     except Exception as e:
-        print(f"Publish error: {e}")
+        logger.warning("Publish error: %s", e)
+
+
+def _signal_message(signal: dict, asset_class: str | None, timestamp) -> bytes:
+    return orjson.dumps({
+        "type": "signal",
+        "signal_type": signal["signal_type"],
+        "symbol": signal["symbol"],
+        "asset_class": asset_class,
+        "price": signal["price"],
+        "short_sma": signal["short_sma"],
+        "long_sma": signal["long_sma"],
+        "details": signal["details"],
+        "timestamp": timestamp,
+    })
+
+
+async def _process_signal_batch(db, batch: list[tuple[str, float, str | None]]):
+    """Run one batch of ticks through the engine and persist/publish its signals."""
+    signals = []
+    for symbol, price, asset_class in batch:
+        signal = signal_engine.on_price(symbol, price)
+        if signal:
+            signals.append((signal, asset_class))
+    if not signals:
+        return
+
+    result = await db.execute(_SIG_INSERT, [
+        {
+            "signal_type": signal["signal_type"],
+            "symbol": signal["symbol"],
+            "asset_class": asset_class,
+            "details": signal["details"],
+        }
+        for signal, asset_class in signals
+    ])
+    timestamps = result.scalars().all()
+    await db.commit()
+
+    await asyncio.gather(*[
+        publish_update("signal_updates", _signal_message(signal, asset_class, ts), symbol=signal["symbol"])
+        for (signal, asset_class), ts in zip(signals, timestamps)
+    ])
+
+
+async def signal_worker():
+    """
+    Drain queued price ticks through the SMA engine and persist any
+    crossover signals in one INSERT per batch, off the ingest request path.
+    Holds a single session for its whole lifetime; a failing batch is
+    logged and dropped so the queue keeps draining.
+    """
+    async with AsyncSessionLocal() as db:
+        while True:
+            batch = [await _signal_queue.get()]
+            while len(batch) < SIGNAL_BATCH_SIZE:
+                try:
+                    batch.append(_signal_queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+
+            try:
+                await _process_signal_batch(db, batch)
+            except Exception:
+                logger.exception("Signal worker error; dropped a batch of %d ticks", len(batch))
+                try:
+                    await db.rollback()
+                except Exception:
+                    logger.exception("Signal worker rollback failed")
+
+
+def start_signal_worker():
+    """Start the signal worker, restarting it if it ever exits with an error."""
+    global _signal_task
+    _signal_task = asyncio.create_task(signal_worker())
+    _signal_task.add_done_callback(_on_signal_worker_done)
+
+
+def _on_signal_worker_done(task: asyncio.Task):
+    if task.cancelled():
+        return
+    logger.error("Signal worker stopped; restarting", exc_info=task.exception())
+    start_signal_worker()
+
+
+def enqueue_signal_tick(symbol: str, price: float, asset_class: str | None) -> bool:
+    """Hand a tick to the signal worker without ever blocking the request; False if dropped."""
+    try:
+        _signal_queue.put_nowait((symbol, price, asset_class))
+        return True
+    except asyncio.QueueFull:
+        return False
 
 
 # ═══════════════════════════════════════════════════════
@@ -193,21 +402,21 @@ async def websocket_endpoint(websocket: WebSocket):
                 await websocket.send_text("pong")
                 continue
             try:
-                msg = json.loads(data)
+                msg = orjson.loads(data)
                 if msg.get("action") == "subscribe":
                     symbols = msg.get("symbols", [])
                     if isinstance(symbols, list) and len(symbols) > 0:
                         manager.subscribe(websocket, symbols)
-                        await websocket.send_text(json.dumps({"type": "subscribed", "symbols": symbols}))
+                        await websocket.send_text(orjson.dumps({"type": "subscribed", "symbols": symbols}).decode())
                 elif msg.get("action") == "subscribe_add":
                     symbol = msg.get("symbol", "")
                     if symbol:
                         manager.subscribe_add(websocket, symbol)
-                        await websocket.send_text(json.dumps({"type": "subscribed", "symbol": symbol}))
+                        await websocket.send_text(orjson.dumps({"type": "subscribed", "symbol": symbol}).decode())
                 elif msg.get("action") == "subscribe_all":
-                    manager.subscriptions[websocket] = None
-                    await websocket.send_text(json.dumps({"type": "subscribed", "symbols": "all"}))
-            except json.JSONDecodeError:
+                    manager.subscribe_all(websocket)
+                    await websocket.send_text(orjson.dumps({"type": "subscribed", "symbols": "all"}).decode())
+            except orjson.JSONDecodeError:
                 pass
     except WebSocketDisconnect:
         manager.disconnect(websocket)
@@ -217,8 +426,7 @@ async def websocket_endpoint(websocket: WebSocket):
 #  API Endpoints (with rate limiting)
 # ═══════════════════════════════════════════════════════
 
-@app.get("/")
-@limiter.limit("100/minute")  # Public endpoint: 100 req/min per IP
+@app.get("/", dependencies=[PUBLIC_RATE_LIMIT])
 async def root(request: Request):
     """Root endpoint - API status and information"""
     return {
@@ -238,10 +446,15 @@ async def root(request: Request):
         }
     }
 
-@app.get("/tickers")
-@limiter.limit("100/minute")  # Public endpoint: 100 req/min per IP
+@app.get("/tickers", dependencies=[PUBLIC_RATE_LIMIT])
 async def get_tickers(request: Request):
     """Return top 50 tickers per asset class (from Redis cache)."""
+    global _tickers_cache
+    # The data version also moves when another process refreshes the lists in Redis
+    version = (_tickers_version, tickers_version())
+    if _tickers_cache[0] == version:
+        return Response(content=_tickers_cache[1], media_type="application/json")
+
     result = {}
     for cls_key, cls_meta in ASSET_CLASSES.items():
         tickers = get_cached_tickers(cls_key)
@@ -255,25 +468,26 @@ async def get_tickers(request: Request):
                 for t in tickers
             ],
         }
-    return result
+    body = orjson.dumps(result)
+    # Re-read: building may have reloaded lists from Redis and moved the version
+    _tickers_cache = ((_tickers_version, tickers_version()), body)
+    return Response(content=body, media_type="application/json")
 
 
-@app.get("/forex/usd-inr")
-@limiter.limit("100/minute")  # Public endpoint: 100 req/min per IP
+@app.get("/forex/usd-inr", dependencies=[PUBLIC_RATE_LIMIT])
 async def get_forex_rate(request: Request):
     """Return the current cached USD→INR rate."""
-    rate = get_usd_inr_rate()
+    rate = await get_usd_inr_rate_async()
     return {"usd_inr": rate, "currency": "INR"}
 
 
-@app.get("/market-data/{symbol}", response_model=List[schemas.MarketPrice])
-@limiter.limit("100/minute")  # Public endpoint: 100 req/min per IP
+@app.get("/market-data/{symbol}", response_model=List[schemas.MarketPrice], dependencies=[PUBLIC_RATE_LIMIT])
 async def get_market_data(
     request: Request,
+    db: ReadDBSession,
     symbol: str,
     asset_class: Optional[str] = Query(None),
     limit: int = Query(100, ge=1, le=500),
-    db: AsyncSession = Depends(get_db),
 ):
     query = select(MarketPrice).where(MarketPrice.symbol == symbol)
     if asset_class:
@@ -283,13 +497,12 @@ async def get_market_data(
     return result.scalars().all()
 
 
-@app.get("/sentiment-data", response_model=List[schemas.SentimentLog])
-@limiter.limit("100/minute")  # Public endpoint: 100 req/min per IP
+@app.get("/sentiment-data", response_model=List[schemas.SentimentLog], dependencies=[PUBLIC_RATE_LIMIT])
 async def get_sentiment_data(
     request: Request,
+    db: ReadDBSession,
     symbol: Optional[str] = Query(None),
     limit: int = Query(50, ge=1, le=200),
-    db: AsyncSession = Depends(get_db),
 ):
     query = select(SentimentLog)
     if symbol:
@@ -299,13 +512,12 @@ async def get_sentiment_data(
     return result.scalars().all()
 
 
-@app.get("/signals", response_model=List[schemas.TradeSignal])
-@limiter.limit("100/minute")  # Public endpoint: 100 req/min per IP
+@app.get("/signals", response_model=List[schemas.TradeSignal], dependencies=[PUBLIC_RATE_LIMIT])
 async def get_signals(
     request: Request,
+    db: ReadDBSession,
     asset_class: Optional[str] = Query(None),
     limit: int = Query(50, ge=1, le=200),
-    db: AsyncSession = Depends(get_db),
 ):
     query = select(TradeSignal)
     if asset_class:
@@ -315,9 +527,8 @@ async def get_signals(
     return result.scalars().all()
 
 
-@app.get("/signals/{symbol}", response_model=List[schemas.TradeSignal])
-@limiter.limit("100/minute")  # Public endpoint: 100 req/min per IP
-async def get_signals_by_symbol(request: Request, symbol: str, db: AsyncSession = Depends(get_db)):
+@app.get("/signals/{symbol}", response_model=List[schemas.TradeSignal], dependencies=[PUBLIC_RATE_LIMIT])
+async def get_signals_by_symbol(request: Request, symbol: str, db: ReadDBSession):
     result = await db.execute(
         select(TradeSignal).where(TradeSignal.symbol == symbol)
         .order_by(TradeSignal.timestamp.desc()).limit(20)
@@ -330,85 +541,155 @@ async def get_signals_by_symbol(request: Request, symbol: str, db: AsyncSession
 #  Higher rate limits for worker (1000/min)
 # ═══════════════════════════════════════════════════════
 
-@app.post("/ingest/market", response_model=schemas.MarketPrice)
-@limiter.limit("1000/minute")  # Ingestion endpoint: 1000 req/min for worker
-async def ingest_market_data(request: Request, data: schemas.MarketPriceCreate, db: AsyncSession = Depends(get_db)):
+def _market_row(data: schemas.MarketPriceCreate) -> dict:
+    """Build the market_prices row for an ingested price."""
     asset_class = data.asset_class or get_asset_class(data.symbol)
     ticker_info = get_ticker_info(data.symbol)
+    return {
+        "symbol": data.symbol,
+        "price": data.price,  # Already in INR (workers convert before posting)
+        "asset_class": asset_class,
+        "exchange": data.exchange or (ticker_info["exchange"] if ticker_info else "unknown"),
+        "volume": data.volume,
+        "currency": "INR",  # Always INR
+    }
 
-    new_entry = MarketPrice(
-        symbol=data.symbol,
-        price=data.price,  # Already in INR (workers convert before posting)
-        asset_class=asset_class,
-        exchange=data.exchange or (ticker_info["exchange"] if ticker_info else "unknown"),
-        volume=data.volume,
-        currency="INR",  # Always INR
-    )
-    db.add(new_entry)
-    await db.commit()
-    await db.refresh(new_entry)
 
-    msg = json.dumps({
+@app.post("/ingest/market", response_model=schemas.MarketPrice, dependencies=[INGEST_RATE_LIMIT])
+async def ingest_market_data(request: Request, data: schemas.MarketPriceCreate):
+    row = _market_row(data)
+    asset_class = row["asset_class"]
+
+    # Committed together with any concurrent ingests; RETURNING gives id/timestamp
+    id_, ts = await _market_batcher.submit(row)
+    new_entry = row | {"id": id_, "timestamp": ts}
+
+    msg = orjson.dumps({
         "type": "market",
-        "symbol": new_entry.symbol,
-        "price": new_entry.price,
-        "asset_class": new_entry.asset_class,
-        "exchange": new_entry.exchange,
+        "symbol": new_entry["symbol"],
+        "price": new_entry["price"],
+        "asset_class": new_entry["asset_class"],
+        "exchange": new_entry["exchange"],
         "currency": "INR",
-        "volume": new_entry.volume,
-        "timestamp": str(new_entry.timestamp),
+        "volume": new_entry["volume"],
+        "timestamp": ts,
     })
-    await publish_update("market_updates", msg, symbol=new_entry.symbol)
-
-    signal = signal_engine.on_price(data.symbol, data.price)
-    if signal:
-        new_signal = TradeSignal(
-            signal_type=signal["signal_type"],
-            symbol=signal["symbol"],
-            asset_class=asset_class,
-            details=signal["details"],
-        )
-        db.add(new_signal)
-        await db.commit()
-        await db.refresh(new_signal)
+    await publish_update("market_updates", msg, symbol=new_entry["symbol"])
 
-        signal_msg = json.dumps({
-            "type": "signal",
-            "signal_type": signal["signal_type"],
-            "symbol": signal["symbol"],
-            "asset_class": asset_class,
-            "price": signal["price"],
-            "short_sma": signal["short_sma"],
-            "long_sma": signal["long_sma"],
-            "details": signal["details"],
-            "timestamp": str(new_signal.timestamp),
-        })
-        await publish_update("signal_updates", signal_msg, symbol=signal["symbol"])
+    # SMA update + signal persistence happen in signal_worker
+    if not enqueue_signal_tick(data.symbol, data.price, asset_class):
+        logger.warning("Signal queue full; dropped tick for %s", data.symbol)
 
     return new_entry
 
 
-@app.post("/ingest/sentiment", response_model=schemas.SentimentLog)
-@limiter.limit("1000/minute")  # Ingestion endpoint: 1000 req/min for worker
-async def ingest_sentiment(request: Request, data: schemas.SentimentLogCreate, db: AsyncSession = Depends(get_db)):
-    new_entry = SentimentLog(
-        source=data.source,
-        sentiment_score=data.sentiment_score,
-        raw_text=data.raw_text,
-        symbol=data.symbol,
-    )
-    db.add(new_entry)
-    await db.commit()
-    await db.refresh(new_entry)
+@app.post("/ingest/sentiment", response_model=schemas.SentimentLog, dependencies=[INGEST_RATE_LIMIT])
+async def ingest_sentiment(request: Request, data: schemas.SentimentLogCreate):
+    row = {
+        "source": data.source,
+        "sentiment_score": data.sentiment_score,
+        "raw_text": data.raw_text,
+        "symbol": data.symbol,
+    }
+    id_, ts = await _sentiment_batcher.submit(row)
+    new_entry = row | {"id": id_, "timestamp": ts}
 
-    msg = json.dumps({
+    msg = orjson.dumps({
         "type": "sentiment",
-        "source": new_entry.source,
-        "score": new_entry.sentiment_score,
-        "text": new_entry.raw_text,
-        "symbol": new_entry.symbol,
-        "timestamp": str(new_entry.timestamp),
+        "source": new_entry["source"],
+        "score": new_entry["sentiment_score"],
+        "text": new_entry["raw_text"],
+        "symbol": new_entry["symbol"],
+        "timestamp": ts,
     })
-    await publish_update("sentiment_updates", msg, symbol=new_entry.symbol)
+    await publish_update("sentiment_updates", msg, symbol=new_entry["symbol"])
 
     return new_entry
+
+
+def _validation_summary(e: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, err['loc'])) or 'row'}: {err['msg']}" for err in e.errors())
+
+
+@app.post("/ingest/market/batch", response_model=schemas.MarketPriceBatchResult, dependencies=[INGEST_RATE_LIMIT])
+async def ingest_market_batch(request: Request, data: schemas.MarketPriceBatch, db: DBSession):
+    """
+    Ingest many price rows in a single transaction (one commit per batch).
+    Rows that fail validation are skipped and listed under `rejected`.
+    """
+    rows, rejected = [], []
+    for index, item in enumerate(data.root):
+        try:
+            rows.append(_market_row(schemas.MarketPriceCreate.model_validate(item)))
+        except ValidationError as e:
+            symbol = item.get("symbol") if isinstance(item, dict) else None
+            rejected.append({
+                "index": index,
+                "symbol": symbol if isinstance(symbol, str) else None,
+                "error": _validation_summary(e),
+            })
+    if rejected:
+        logger.warning("Market batch: rejected %d of %d rows", len(rejected), len(data.root))
+    if not rows:
+        return {"inserted": [], "rejected": rejected}
+
+    async with db.begin():
+        result = await db.execute(_MP_INSERT, rows)
+        for row, (id_, ts) in zip(rows, result.all()):
+            row["id"] = id_
+            row["timestamp"] = ts
+
+    await asyncio.gather(*[
+        publish_update("market_updates", orjson.dumps({
+            "type": "market",
+            "symbol": row["symbol"],
+            "price": row["price"],
+            "asset_class": row["asset_class"],
+            "exchange": row["exchange"],
+            "currency": "INR",
+            "volume": row["volume"],
+            "timestamp": row["timestamp"],
+        }), symbol=row["symbol"])
+        for row in rows
+    ])
+    dropped = sum(not enqueue_signal_tick(row["symbol"], row["price"], row["asset_class"]) for row in rows)
+    if dropped:
+        logger.warning("Signal queue full; dropped %d of %d ticks", dropped, len(rows))
+
+    return {"inserted": rows, "rejected": rejected}
+
+
+@app.post("/ingest/sentiment/batch", response_model=List[schemas.SentimentLog], dependencies=[INGEST_RATE_LIMIT])
+async def ingest_sentiment_batch(request: Request, data: schemas.SentimentLogBatch, db: DBSession):
+    """Ingest many sentiment rows in a single transaction (one commit per batch)."""
+    rows = [
+        {
+            "source": item.source,
+            "sentiment_score": item.sentiment_score,
+            "raw_text": item.raw_text,
+            "symbol": item.symbol,
+        }
+        for item in data.root
+    ]
+    if not rows:
+        return []
+
+    async with db.begin():
+        result = await db.execute(_SL_INSERT, rows)
+        for row, (id_, ts) in zip(rows, result.all()):
+            row["id"] = id_
+            row["timestamp"] = ts
+
+    await asyncio.gather(*[
+        publish_update("sentiment_updates", orjson.dumps({
+            "type": "sentiment",
+            "source": row["source"],
+            "score": row["sentiment_score"],
+            "text": row["raw_text"],
+            "symbol": row["symbol"],
+            "timestamp": row["timestamp"],
+        }), symbol=row["symbol"])
+        for row in rows
+    ])
+
+    return rows
@@ -1,10 +1,15 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Index, text
 from datetime import datetime
 from backend.database import Base
 
 
 class MarketPrice(Base):
     __tablename__ = "market_prices"
+    __table_args__ = (
+        # Serve "WHERE ... ORDER BY timestamp DESC LIMIT N" as an index range scan
+        Index("ix_mp_symbol_ts", "symbol", text("timestamp DESC")),
+        Index("ix_mp_cls_ts", "asset_class", text("timestamp DESC")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     symbol = Column(String, index=True)
@@ -18,21 +23,28 @@ class MarketPrice(Base):
 
 class SentimentLog(Base):
     __tablename__ = "sentiment_logs"
+    __table_args__ = (
+        Index("ix_sl_symbol_ts", "symbol", text("timestamp DESC")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     symbol = Column(String, index=True, nullable=True)  # optional: tie to asset
     source = Column(String)       # reddit, twitter, news, coingecko
     sentiment_score = Column(Float)   # -1.0 to 1.0
     raw_text = Column(Text)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
 
 
 class TradeSignal(Base):
     __tablename__ = "trade_signals"
+    __table_args__ = (
+        Index("ix_sig_symbol_ts", "symbol", text("timestamp DESC")),
+        Index("ix_sig_cls_ts", "asset_class", text("timestamp DESC")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     signal_type = Column(String)      # BUY, SELL
     symbol = Column(String, index=True)
     asset_class = Column(String, nullable=True)
     details = Column(String)
-    timestamp = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
\ No newline at end of file
@@ -1,14 +1,20 @@
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, RootModel, field_validator
 from datetime import datetime
-from typing import Optional
-import re
+from typing import Any, Optional
+from backend.security import escape_html
+from backend.validators import ASSET_CLASS_NAMES, MAX_PRICE, SYMBOL_MAX_LENGTH, is_valid_symbol
+
+
+class SchemaBase(BaseModel):
+    """Shared config so every schema is built with the same settings."""
+    model_config = ConfigDict(from_attributes=True, str_strip_whitespace=True)
 
 
 # --- Market Price ---
 
-class MarketPriceBase(BaseModel):
-    symbol: str = Field(..., min_length=1, max_length=20, description="Trading symbol")
-    price: float = Field(..., gt=0, le=1_000_000_000, description="Price in INR (must be positive)")
+class MarketPriceBase(SchemaBase):
+    symbol: str = Field(..., min_length=1, max_length=SYMBOL_MAX_LENGTH, description="Trading symbol")
+    price: float = Field(..., gt=0, le=MAX_PRICE, description="Price in INR (must be positive)")
     asset_class: Optional[str] = Field(None, max_length=50, description="crypto, us_stock, in_stock")
     exchange: Optional[str] = Field(None, max_length=100, description="Exchange name")
     volume: Optional[float] = Field(None, ge=0, description="Trading volume (non-negative)")
@@ -18,7 +24,7 @@ class MarketPriceBase(BaseModel):
     @classmethod
     def validate_symbol(cls, v: str) -> str:
         """Validate symbol contains only alphanumeric, hyphens, underscores."""
-        if not re.match(r'^[A-Za-z0-9_-]+$', v):
+        if not is_valid_symbol(v):
             raise ValueError("Symbol can only contain letters, numbers, hyphens, and underscores")
         return v.upper()
     
@@ -27,35 +33,44 @@ class MarketPriceBase(BaseModel):
     def validate_asset_class(cls, v: Optional[str]) -> Optional[str]:
         """Validate asset class is one of the allowed values."""
         if v is not None:
-            allowed = ['crypto', 'us_stock', 'in_stock']
-            if v not in allowed:
-                raise ValueError(f"Asset class must be one of: {', '.join(allowed)}")
+            if v not in ASSET_CLASS_NAMES:
+                raise ValueError(f"Asset class must be one of: {', '.join(ASSET_CLASS_NAMES)}")
         return v
 
 class MarketPriceCreate(MarketPriceBase):
     pass
 
+# Rows are validated one by one by the endpoint, so a bad row is reported
+# back instead of failing the whole batch
+MarketPriceBatch = RootModel[list[Any]]
+
 class MarketPrice(MarketPriceBase):
     id: int
     timestamp: datetime
 
-    class Config:
-        from_attributes = True
+class BatchRejection(SchemaBase):
+    index: int = Field(..., description="Position of the row in the submitted batch")
+    symbol: Optional[str] = None
+    error: str
+
+class MarketPriceBatchResult(SchemaBase):
+    inserted: list[MarketPrice]
+    rejected: list[BatchRejection]
 
 
 # --- Sentiment Log ---
 
-class SentimentLogBase(BaseModel):
+class SentimentLogBase(SchemaBase):
     source: str = Field(..., min_length=1, max_length=100, description="Source of sentiment")
     sentiment_score: float = Field(..., ge=-1, le=1, description="Sentiment score (-1 to 1)")
     raw_text: str = Field(..., min_length=1, max_length=5000, description="Sentiment text")
-    symbol: Optional[str] = Field(None, min_length=1, max_length=20, description="Related symbol")
+    symbol: Optional[str] = Field(None, min_length=1, max_length=SYMBOL_MAX_LENGTH, description="Related symbol")
     
     @field_validator('symbol')
     @classmethod
     def validate_symbol(cls, v: Optional[str]) -> Optional[str]:
         """Validate symbol format if provided."""
-        if v is not None and not re.match(r'^[A-Za-z0-9_-]+$', v):
+        if v is not None and not is_valid_symbol(v):
             raise ValueError("Symbol can only contain letters, numbers, hyphens, and underscores")
         return v.upper() if v else None
     
@@ -63,25 +78,23 @@ class SentimentLogBase(BaseModel):
     @classmethod
     def sanitize_text(cls, v: str) -> str:
         """Sanitize text to prevent XSS."""
-        import html
-        return html.escape(v.strip())
+        return escape_html(v.strip())
 
 class SentimentLogCreate(SentimentLogBase):
     pass
 
+SentimentLogBatch = RootModel[list[SentimentLogCreate]]
+
 class SentimentLog(SentimentLogBase):
     id: int
     timestamp: datetime
 
-    class Config:
-        from_attributes = True
-
 
 # --- Trade Signal ---
 
-class TradeSignalBase(BaseModel):
+class TradeSignalBase(SchemaBase):
     signal_type: str = Field(..., min_length=1, max_length=50, description="Signal type")
-    symbol: str = Field(..., min_length=1, max_length=20, description="Trading symbol")
+    symbol: str = Field(..., min_length=1, max_length=SYMBOL_MAX_LENGTH, description="Trading symbol")
     details: Optional[str] = Field(None, max_length=1000, description="Signal details")
     asset_class: Optional[str] = Field(None, max_length=50, description="Asset class")
     
@@ -89,7 +102,7 @@ class TradeSignalBase(BaseModel):
     @classmethod
     def validate_symbol(cls, v: str) -> str:
         """Validate symbol format."""
-        if not re.match(r'^[A-Za-z0-9_-]+$', v):
+        if not is_valid_symbol(v):
             raise ValueError("Symbol can only contain letters, numbers, hyphens, and underscores")
         return v.upper()
     
@@ -109,13 +122,10 @@ class TradeSignal(TradeSignalBase):
     id: int
     timestamp: datetime
 
-    class Config:
-        from_attributes = True
-
 
 # --- Ticker Info (for GET /tickers) ---
 
-class TickerInfo(BaseModel):
+class TickerInfo(SchemaBase):
     symbol: str
     name: str
     asset_class: str
@@ -2,46 +2,215 @@
 Security utilities and middleware for TradeSentient API
 Implements OWASP best practices, rate limiting, and input validation
 """
-from fastapi import Request, HTTPException, status
+from fastapi import Depends, Request, HTTPException, status
 from fastapi.responses import JSONResponse
 from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
+from limits import RateLimitItemPerSecond
 from starlette.middleware.base import BaseHTTPMiddleware
 from typing import Callable
+from functools import lru_cache
+import asyncio
+import ipaddress
+import math
 import re
-import html
 import os
+import time
 
 
 # ═══════════════════════════════════════════════════════
 #  Rate Limiter Configuration
 # ═══════════════════════════════════════════════════════
 
+# Proxies whose X-Forwarded-For header is believed (comma-separated CIDRs).
+# Defaults to loopback and private ranges, where a hosting load balancer sits.
+TRUSTED_PROXIES = tuple(
+    ipaddress.ip_network(cidr.strip(), strict=False)
+    for cidr in os.getenv(
+        "TRUSTED_PROXIES",
+        "127.0.0.0/8,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16,::1/128,fc00::/7",
+    ).split(",")
+    if cidr.strip()
+)
+
+
+@lru_cache(maxsize=1024)
+def _is_trusted_proxy(host: str) -> bool:
+    try:
+        addr = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(addr in net for net in TRUSTED_PROXIES)
+
+
 def get_identifier(request: Request) -> str:
     """
     Get unique identifier for rate limiting.
     Uses IP address as the primary identifier.
     """
-    # Get real IP from X-Forwarded-For header (for proxies/load balancers)
-    forwarded = request.headers.get("X-Forwarded-For")
-    if forwarded:
-        return forwarded.split(",")[0].strip()
-    return get_remote_address(request)
+    client = request.scope.get("client")
+    host = client[0] if client else "127.0.0.1"
+
+    # Only a trusted proxy may tell us the real client IP via X-Forwarded-For;
+    # from anyone else the header is spoofable and ignored. Proxies append to
+    # the header, so the leftmost hops are client-controlled: walk from the
+    # right and take the first address that isn't one of our proxies.
+    if _is_trusted_proxy(host):
+        forwarded = request.headers.get("X-Forwarded-For")
+        if forwarded:
+            for hop in reversed(forwarded.split(",")):
+                hop = hop.strip()
+                if hop and not _is_trusted_proxy(hop):
+                    return hop
+    return host
 
 
-# Initialize rate limiter
+# Initialize rate limiter (in-process fallback when Redis is unavailable)
 limiter = Limiter(
     key_func=get_identifier,
     default_limits=["100/minute"],  # Default: 100 requests per minute per IP
-    storage_uri="memory://",  # Use in-memory storage (upgrade to Redis for production)
+    storage_uri="memory://",
+    strategy="fixed-window",
 )
 
 
+# ═══════════════════════════════════════════════════════
+#  Redis-backed Rate Limiting (shared across workers)
+# ═══════════════════════════════════════════════════════
+
+# Atomic fixed-window counter: add ARGV[2] hits, set the TTL on first write
+_RATE_LIMIT_LUA = """
+local c = redis.call('INCRBY', KEYS[1], ARGV[2])
+if c == tonumber(ARGV[2]) then redis.call('EXPIRE', KEYS[1], ARGV[1]) end
+return c
+"""
+
+RATE_LIMIT_FLUSH_INTERVAL = 0.02  # seconds between batched Redis writes
+
+
+class RateLimitHit(Exception):
+    """Raised by the `rate_limit` dependency when a client exceeds its quota."""
+
+    def __init__(self, retry_after: int = 60):
+        super().__init__("Rate limit exceeded")
+        self.retry_after = retry_after
+
+
+class _RedisHitCounter:
+    """
+    Counts hits locally and flushes them to Redis in one pipeline every
+    `interval` seconds, instead of a round trip per request. A request is
+    judged against the last global count Redis returned plus this process's
+    unflushed hits, so other workers' traffic is seen at most one flush late.
+    """
+
+    def __init__(self, redis_client, interval: float = RATE_LIMIT_FLUSH_INTERVAL):
+        self._redis = redis_client
+        self._script = redis_client.register_script(_RATE_LIMIT_LUA)
+        self._interval = interval
+        self._pending: dict[str, list[int]] = {}        # key -> [hits, window]
+        self._known: dict[str, tuple[int, int]] = {}    # key -> (global count, expires at)
+        self._task: asyncio.Task | None = None
+        self.healthy = True
+
+    def hit(self, key: str, window: int, expires_at: int) -> int:
+        """Record one hit and return the estimated count for this window."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        entry = self._pending.get(key)
+        if entry is None:
+            entry = self._pending[key] = [0, window]
+        entry[0] += 1
+        known = self._known.get(key)
+        if known is None:
+            self._known[key] = known = (0, expires_at)
+        return known[0] + entry[0]
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self._interval)
+            if self._pending:
+                await self.flush()
+
+    async def flush(self):
+        batch, self._pending = self._pending, {}
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for key, (hits, window) in batch.items():
+                    await self._script(keys=[key], args=[window, hits], client=pipe)
+                counts = await pipe.execute()
+        except Exception:
+            self.healthy = False
+            return
+        self.healthy = True
+        now = time.time()
+        known = self._known
+        for key, count in zip(batch, counts):
+            known[key] = (int(count), known.get(key, (0, now + batch[key][1]))[1])
+        for key in [k for k, (_, expires_at) in known.items() if expires_at <= now]:
+            del known[key]
+
+
+_hit_counter: _RedisHitCounter | None = None
+
+
+def init_rate_limit_redis(redis_client) -> None:
+    """Start counting rate-limit hits in Redis via a connected async client."""
+    global _hit_counter
+    _hit_counter = _RedisHitCounter(redis_client)
+
+
+def rate_limit(limit: int, window: int = 60):
+    """
+    FastAPI dependency enforcing `limit` requests per `window` seconds per
+    client and route. Counts in Redis when available, otherwise falls back
+    to slowapi's in-process storage.
+    """
+    item = RateLimitItemPerSecond(limit, window)
+
+    async def check(request: Request) -> None:
+        ident = get_identifier(request)
+        path = getattr(request.scope.get("route"), "path", request.url.path)
+
+        counter = _hit_counter
+        if counter is not None:
+            now = int(time.time())
+            bucket = now // window
+            count = counter.hit(f"rl:{ident}:{path}:{bucket}", window, (bucket + 1) * window)
+            if counter.healthy:
+                if count > limit:
+                    raise RateLimitHit(retry_after=window - now % window)
+                return
+
+        if not limiter.limiter.hit(item, ident, path):
+            raise RateLimitHit(retry_after=window)
+
+    return Depends(check)
+
+
 # ═══════════════════════════════════════════════════════
 #  Input Sanitization & Validation
 # ═══════════════════════════════════════════════════════
 
+# \Z rather than $ so a trailing newline is rejected
+_SYMBOL_RE = re.compile(r'^[A-Za-z0-9_-]+\Z')
+
+# Same entities as html.escape(quote=True), applied in a single pass
+_HTML_ESCAPE_TABLE = str.maketrans({
+    "&": "&amp;",
+    "<": "&lt;",
+    ">": "&gt;",
+    '"': "&quot;",
+    "'": "&#x27;",
+})
+
+
+def escape_html(text: str) -> str:
+    """Escape HTML special characters (equivalent to html.escape)."""
+    if text.isalnum():
+        return text
+    return text.translate(_HTML_ESCAPE_TABLE)
+
 def sanitize_string(text: str, max_length: int = 1000) -> str:
     """
     Sanitize string input to prevent XSS and injection attacks.
@@ -70,7 +239,7 @@ def sanitize_string(text: str, max_length: int = 1000) -> str:
         )
     
     # Escape HTML to prevent XSS
-    sanitized = html.escape(text.strip())
+    sanitized = escape_html(text.strip())
     
     return sanitized
 
@@ -103,7 +272,7 @@ def validate_symbol(symbol: str) -> str:
         )
     
     # Allow only alphanumeric, hyphens, and underscores
-    if not re.match(r'^[A-Za-z0-9_-]+$', symbol):
+    if not _SYMBOL_RE.match(symbol):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Symbol can only contain letters, numbers, hyphens, and underscores"
@@ -125,10 +294,11 @@ def validate_price(price: float) -> float:
     Raises:
         HTTPException: If price is invalid
     """
-    if not isinstance(price, (int, float)):
+    # NaN / inf would pass the range checks below and poison the SMA engine
+    if type(price) not in (int, float) or not math.isfinite(price):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Price must be a number"
+            detail="Price must be a finite number"
         )
     
     if price <= 0:
@@ -160,13 +330,14 @@ def validate_sentiment_score(score: float) -> float:
     Raises:
         HTTPException: If score is out of range
     """
-    if not isinstance(score, (int, float)):
+    if type(score) not in (int, float):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Sentiment score must be a number"
         )
     
-    if score < -1 or score > 1:
+    # Chained comparison is False for NaN, so this also rejects NaN / inf
+    if not -1 <= score <= 1:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Sentiment score must be between -1 and 1"
@@ -179,34 +350,49 @@ def validate_sentiment_score(score: float) -> float:
 #  Security Headers Middleware
 # ═══════════════════════════════════════════════════════
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+class SecurityHeadersMiddleware:
     """
     Adds security headers to all responses following OWASP best practices.
+
+    Plain ASGI middleware: the headers are pre-encoded once and appended to
+    the raw `http.response.start` message, skipping BaseHTTPMiddleware's
+    request/response wrapping.
     """
-    
-    async def dispatch(self, request: Request, call_next: Callable):
-        response = await call_next(request)
-        
+
+    HEADERS = (
         # Prevent MIME type sniffing
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        
+        (b"x-content-type-options", b"nosniff"),
         # Prevent clickjacking
-        response.headers["X-Frame-Options"] = "DENY"
-        
+        (b"x-frame-options", b"DENY"),
         # Enable XSS protection (legacy browsers)
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        
+        (b"x-xss-protection", b"1; mode=block"),
         # Content Security Policy (basic)
-        response.headers["Content-Security-Policy"] = "default-src 'self'"
-        
+        (b"content-security-policy", b"default-src 'self'"),
         # Referrer policy
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        
-        # HTTPS enforcement (only if running on HTTPS)
-        if request.url.scheme == "https":
-            response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-        
-        return response
+        (b"referrer-policy", b"strict-origin-when-cross-origin"),
+    )
+    # HTTPS enforcement (only if running on HTTPS)
+    HSTS = (b"strict-transport-security", b"max-age=31536000; includeSubDomains")
+
+    def __init__(self, app):
+        self.app = app
+        self._https_headers = self.HEADERS + (self.HSTS,)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        extra = self._https_headers if scope.get("scheme") == "https" else self.HEADERS
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", ()))
+                headers.extend(extra)
+                message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
 
 
 # ═══════════════════════════════════════════════════════
@@ -218,11 +404,18 @@ class RequestSizeLimitMiddleware(BaseHTTPMiddleware):
     Limits request body size to prevent large payload DoS attacks.
     """
     
+    # Only these methods carry a request body worth checking
+    BODY_METHODS = frozenset({"POST", "PUT", "PATCH"})
+
     def __init__(self, app, max_size: int = 1_048_576):  # Default: 1MB
         super().__init__(app)
         self.max_size = max_size
+        self.max_size_mb = max_size / 1_048_576
     
     async def dispatch(self, request: Request, call_next: Callable):
+        if request.method not in self.BODY_METHODS:
+            return await call_next(request)
+
         # Check Content-Length header
         content_length = request.headers.get("content-length")
         
@@ -232,7 +425,7 @@ class RequestSizeLimitMiddleware(BaseHTTPMiddleware):
                 content={
                     "error": "Request body too large",
                     "max_size_bytes": self.max_size,
-                    "max_size_mb": self.max_size / 1_048_576
+                    "max_size_mb": self.max_size_mb
                 }
             )
         
@@ -243,20 +436,21 @@ class RequestSizeLimitMiddleware(BaseHTTPMiddleware):
 #  Graceful Rate Limit Error Handler
 # ═══════════════════════════════════════════════════════
 
-async def rate_limit_error_handler(request: Request, exc: RateLimitExceeded):
+async def rate_limit_error_handler(request: Request, exc: RateLimitExceeded | RateLimitHit):
     """
     Custom handler for rate limit exceeded errors.
     Returns graceful 429 response with Retry-After header.
     """
+    retry_after = getattr(exc, "retry_after", 60)
     return JSONResponse(
         status_code=status.HTTP_429_TOO_MANY_REQUESTS,
         content={
             "error": "Rate limit exceeded",
             "message": "Too many requests. Please slow down and try again later.",
-            "retry_after_seconds": 60
+            "retry_after_seconds": retry_after
         },
         headers={
-            "Retry-After": "60"
+            "Retry-After": str(retry_after)
         }
     )
 
@@ -5,9 +5,11 @@ Maintains a rolling price window per symbol and generates BUY/SELL
 signals when the short-term SMA crosses the long-term SMA.
 """
 
-from collections import defaultdict, deque
+from collections import defaultdict
 from datetime import datetime
 
+import numpy as np
+
 
 class SignalEngine:
     """
@@ -20,30 +22,65 @@ class SignalEngine:
     def __init__(self, short_window: int = 10, long_window: int = 30):
         self.short_window = short_window
         self.long_window = long_window
-        # symbol -> deque of prices
-        self.prices: dict[str, deque] = defaultdict(lambda: deque(maxlen=long_window + 5))
+        # symbol -> float64 ring buffer of the last `long_window` prices;
+        # head is the next slot to write (the oldest price once full)
+        self.buffers: dict[str, np.ndarray] = {}
+        self.head: dict[str, int] = defaultdict(int)
+        self.count: dict[str, int] = defaultdict(int)
+        # symbol -> running sums of the short / long windows, updated in O(1)
+        self.short_sum: dict[str, float] = defaultdict(float)
+        self.long_sum: dict[str, float] = defaultdict(float)
         # symbol -> last signal direction (1 = bullish, -1 = bearish, 0 = neutral)
         self.last_signal: dict[str, int] = defaultdict(int)
 
-    def _sma(self, prices: list[float], window: int) -> float | None:
-        if len(prices) < window:
-            return None
-        return sum(prices[-window:]) / window
+    def history(self, symbol: str) -> np.ndarray:
+        """Prices currently in the window for `symbol`, oldest first."""
+        buf = self.buffers.get(symbol)
+        if buf is None:
+            return np.empty(0, dtype=np.float64)
+        n = self.count[symbol]
+        if n < buf.size:
+            return buf[:n].copy()
+        return np.roll(buf, -self.head[symbol])
 
     def on_price(self, symbol: str, price: float) -> dict | None:
         """
         Feed a new price tick. Returns a signal dict if a crossover
         occurred, or None if no signal.
         """
-        self.prices[symbol].append(price)
-        price_list = list(self.prices[symbol])
+        buf = self.buffers.get(symbol)
+        if buf is None:
+            buf = self.buffers[symbol] = np.empty(self.long_window, dtype=np.float64)
+        head = self.head[symbol]
+        n = self.count[symbol]
 
-        short_sma = self._sma(price_list, self.short_window)
-        long_sma = self._sma(price_list, self.long_window)
+        # Slide both windows: add the new price, drop the one falling out
+        short_sum = self.short_sum[symbol] + price
+        if n >= self.short_window:
+            short_sum -= buf.item((head - self.short_window) % self.long_window)
+        long_sum = self.long_sum[symbol] + price
+        if n == self.long_window:
+            long_sum -= buf.item(head)
+        buf[head] = price
+        head = self.head[symbol] = (head + 1) % self.long_window
+        if n < self.long_window:
+            n = self.count[symbol] = n + 1
+        if head == 0:
+            # Once per window the buffer is in oldest-first order: rebuild both
+            # sums from it so float error from the add/subtract updates can't
+            # accumulate (and they equal a plain sum() over the window)
+            window = buf.tolist()
+            long_sum = sum(window)
+            short_sum = sum(window[-self.short_window:])
+        self.short_sum[symbol] = short_sum
+        self.long_sum[symbol] = long_sum
 
-        if short_sma is None or long_sma is None:
+        if n < self.long_window:
             return None  # Not enough data yet
 
+        short_sma = short_sum / self.short_window
+        long_sma = long_sum / self.long_window
+
         # Determine current stance
         if short_sma > long_sma:
             current = 1  # Bullish
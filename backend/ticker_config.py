@@ -6,13 +6,23 @@ Results are cached in Redis with 15-minute TTL.
 No hardcoded ticker lists — everything is API-driven.
 """
 
+import io
 import os
-import json
+import logging
+import threading
 import time
-import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import orjson
+from backend.http_client import session
+
+logger = logging.getLogger(__name__)
 
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
 CACHE_TTL = 900  # 15 minutes
+REDIS_RETRY_AFTER = 30  # seconds to skip Redis after a failure
+SYMBOL_INDEX_TTL = 60  # max age of lookups derived from the ticker lists
+TICKERS_VERSION_KEY = "tickers:version"  # INCR'd in Redis on every ticker list write
+REMOTE_VERSION_CHECK_INTERVAL = 5  # seconds between checks for other processes' writes
 
 COINGECKO_URL = "https://api.coingecko.com/api/v3"
 
@@ -35,44 +45,139 @@ ASSET_CLASSES = {
     },
 }
 
-# ─── In-memory cache fallback ───
+# ─── In-process cache, checked before Redis ───
 _mem_cache: dict[str, dict] = {}
 
+# cache key -> lock held while that key is being fetched
+_fetch_locks: dict[str, threading.Lock] = {}
+
+# Bumped on cache writes so derived lookups know to rebuild
+_cache_version = 0
+_crypto_cache_version = 0
+
+# Last TICKERS_VERSION_KEY value seen in Redis, and when it was checked
+_remote_version: int | None = None
+_remote_checked_at = 0.0
+
+
+# ─── Shared Redis client with a simple circuit breaker ───
+_redis_client = None
+_redis_failed_until = 0.0
+_redis_lock = threading.Lock()
+
 
 def _get_redis():
-    try:
-        import redis
-        r = redis.from_url(REDIS_URL, decode_responses=True, socket_timeout=1, socket_connect_timeout=1)
-        r.ping()
-        return r
-    except Exception:
+    """Shared Redis client, or None while Redis is marked down."""
+    global _redis_client, _redis_failed_until
+    if time.monotonic() < _redis_failed_until:
         return None
+    if _redis_client is not None:
+        return _redis_client
+    with _redis_lock:
+        if _redis_client is None:
+            try:
+                import redis
+                pool = redis.ConnectionPool.from_url(
+                    REDIS_URL,
+                    max_connections=16,
+                    socket_timeout=1,
+                    socket_connect_timeout=1,
+                    health_check_interval=30,
+                )
+                _redis_client = redis.Redis(connection_pool=pool)
+            except Exception:
+                _redis_failed_until = time.monotonic() + REDIS_RETRY_AFTER
+                return None
+    return _redis_client
+
+
+def _mark_redis_down():
+    """Skip Redis for REDIS_RETRY_AFTER seconds after a failed command."""
+    global _redis_failed_until
+    _redis_failed_until = time.monotonic() + REDIS_RETRY_AFTER
+
+
+def _reset_redis():
+    """Drop the shared client and clear the breaker (used by tests)."""
+    global _redis_client, _redis_failed_until, _remote_checked_at
+    _redis_client = None
+    _redis_failed_until = 0.0
+    _remote_checked_at = 0.0
+
+
+def _remember(key: str, data: list[dict], ttl: int):
+    """Store in the in-process cache (expiry on the monotonic clock)."""
+    global _cache_version, _crypto_cache_version
+    _mem_cache[key] = {"data": data, "expires": time.monotonic() + ttl}
+    _cache_version += 1
+    if key == "tickers:crypto":
+        _crypto_cache_version += 1
 
 
 def _set_cache(key: str, data: list[dict], ttl: int = CACHE_TTL):
     """Cache ticker list in Redis + in-memory."""
-    _mem_cache[key] = {"data": data, "expires": time.time() + ttl}
+    global _remote_version
+    _remember(key, data, ttl)
     r = _get_redis()
     if r:
         try:
-            r.setex(key, ttl, json.dumps(data))
+            with r.pipeline(transaction=False) as pipe:
+                _, version = pipe.setex(key, ttl, orjson.dumps(data)).incr(TICKERS_VERSION_KEY).execute()
+            _remote_version = version  # our own write; nothing to invalidate
         except Exception:
-            pass
+            _mark_redis_down()
+
+
+def _check_remote_version():
+    """
+    Drop the in-memory lists when another process (Celery beat, another API
+    worker) has rewritten them in Redis, so they are re-read on next access.
+    Checked at most every REMOTE_VERSION_CHECK_INTERVAL seconds.
+    """
+    global _remote_version, _remote_checked_at, _cache_version, _crypto_cache_version
+    now = time.monotonic()
+    if now - _remote_checked_at < REMOTE_VERSION_CHECK_INTERVAL:
+        return
+    _remote_checked_at = now
+    r = _get_redis()
+    if not r:
+        return
+    try:
+        raw = r.get(TICKERS_VERSION_KEY)
+    except Exception:
+        _mark_redis_down()
+        return
+    version = int(raw) if raw else 0
+    if version != _remote_version:
+        _remote_version = version
+        _mem_cache.clear()
+        _cache_version += 1
+        _crypto_cache_version += 1
+
+
+def tickers_version() -> int:
+    """Version of the ticker lists, changing whenever any process rewrites them."""
+    _check_remote_version()
+    return _cache_version
 
 
 def _get_cache(key: str) -> list[dict] | None:
-    """Read from Redis, fall back to in-memory."""
+    """Read from memory, then Redis (copying a hit into memory)."""
+    _check_remote_version()
+    mem = _mem_cache.get(key)
+    if mem and time.monotonic() < mem["expires"]:
+        return mem["data"]
     r = _get_redis()
     if r:
         try:
-            cached = r.get(key)
+            with r.pipeline(transaction=False) as pipe:
+                cached, ttl = pipe.get(key).ttl(key).execute()
             if cached:
-                return json.loads(cached)
+                data = orjson.loads(cached)
+                _remember(key, data, ttl if ttl > 0 else CACHE_TTL)
+                return data
         except Exception:
-            pass
-    mem = _mem_cache.get(key)
-    if mem and time.time() < mem["expires"]:
-        return mem["data"]
+            _mark_redis_down()
     return None
 
 
@@ -97,8 +202,8 @@ CRYPTO_SEED = [
 def fetch_top_crypto(limit: int = 50) -> list[dict]:
     """Fetch top N crypto by market cap from CoinGecko (INR prices)."""
     try:
-        print(f"  ? Fetching top {limit} crypto from CoinGecko...")
-        resp = requests.get(
+        logger.info("Fetching top %d crypto from CoinGecko...", limit)
+        resp = session.get(
             f"{COINGECKO_URL}/coins/markets",
             params={
                 "vs_currency": "inr",
@@ -110,27 +215,29 @@ def fetch_top_crypto(limit: int = 50) -> list[dict]:
             timeout=15,
         )
         if resp.status_code != 200:
-            print(f"  ? CoinGecko error {resp.status_code}: {resp.text[:100]}")
+            logger.warning("CoinGecko error %s: %s", resp.status_code, resp.text[:100])
             return CRYPTO_SEED
 
-        coins = resp.json()
+        coins = orjson.loads(resp.content)
         if not coins:
-            print("  ? CoinGecko returned empty list")
+            logger.warning("CoinGecko returned empty list")
             return CRYPTO_SEED
 
-        result = []
-        for coin in coins:
-            result.append({
+        # Keep only the fields we use from each ~30-field coin record
+        result = [
+            {
                 "symbol": coin["symbol"].upper(),
                 "name": coin["name"],
                 "coingecko_id": coin["id"],
                 "market_cap": coin.get("market_cap", 0),
                 "current_price": coin.get("current_price"),
-            })
-        print(f"  ? Fetched {len(result)} crypto assets")
+            }
+            for coin in coins
+        ]
+        logger.info("Fetched %d crypto assets", len(result))
         return result
     except Exception as e:
-        print(f"  ? CoinGecko fetch exception: {e}")
+        logger.warning("CoinGecko fetch exception: %s", e)
         return CRYPTO_SEED
 
 
@@ -155,46 +262,43 @@ US_STOCK_SEED = [
 def fetch_top_us_stocks(limit: int = 50) -> list[dict]:
     """Scrape S&P 500 constituents from Wikipedia, return top N."""
     try:
-        from bs4 import BeautifulSoup
-        print("  ? Fetching S&P 500 from Wikipedia...")
+        import pandas as pd
+        logger.info("Fetching S&P 500 from Wikipedia...")
 
-        resp = requests.get(
+        resp = session.get(
             "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies",
             timeout=15,
-            headers={"User-Agent": "TradeSentient/3.0"},
         )
         if resp.status_code != 200:
-            print(f"  ? Wikipedia error {resp.status_code}")
+            logger.warning("Wikipedia error %s", resp.status_code)
             return US_STOCK_SEED
 
-        soup = BeautifulSoup(resp.text, "lxml")
-        table = soup.find("table", {"id": "constituents"})
-
-        if not table:
-            print("  ? Wikipedia S&P 500 table not found")
+        try:
+            tables = pd.read_html(io.StringIO(resp.text), attrs={"id": "constituents"}, flavor="lxml")
+        except ValueError:  # raised when no matching table exists
+            tables = []
+        if not tables:
+            logger.warning("Wikipedia S&P 500 table not found")
             return US_STOCK_SEED
 
-        rows = table.find_all("tr")[1:]  # skip header
-        result = []
-        for row in rows[:limit]:
-            cols = row.find_all("td")
-            if len(cols) >= 2:
-                symbol = cols[0].get_text(strip=True).replace(".", "-")
-                name = cols[1].get_text(strip=True)
-                result.append({"symbol": symbol, "name": name})
+        df = tables[0].head(limit)
+        result = [
+            {"symbol": str(symbol).strip().replace(".", "-"), "name": str(name).strip()}
+            for symbol, name in zip(df["Symbol"], df["Security"])
+        ]
 
         count = len(result)
         if count < 10:
-            print(f"  ? Wikipedia scrape returned only {count} stocks, using SEED")
+            logger.warning("Wikipedia scrape returned only %d stocks, using SEED", count)
             return US_STOCK_SEED
         
-        print(f"  ? Fetched {count} US stocks")
+        logger.info("Fetched %d US stocks", count)
         return result
     except ImportError:
-        print("  ? beautifulsoup4 not installed — using seed US stocks")
+        logger.warning("pandas/lxml not installed — using seed US stocks")
         return US_STOCK_SEED
     except Exception as e:
-        print(f"  ? Wikipedia scrape exception: {e}")
+        logger.warning("Wikipedia scrape exception: %s", e)
         return US_STOCK_SEED
 
 
@@ -219,52 +323,60 @@ IN_STOCK_SEED = [
 def fetch_top_in_stocks(limit: int = 50) -> list[dict]:
     """Fetch NIFTY 50 constituents from Wikipedia."""
     try:
-        from bs4 import BeautifulSoup
-        print("  ? Fetching NIFTY 50 from Wikipedia...")
+        import lxml.html
+        import pandas as pd
+        logger.info("Fetching NIFTY 50 from Wikipedia...")
 
-        resp = requests.get(
+        resp = session.get(
             "https://en.wikipedia.org/wiki/NIFTY_50",
             timeout=15,
-            headers={"User-Agent": "TradeSentient/3.0"},
         )
         if resp.status_code != 200:
-            print(f"  ? Wikipedia error {resp.status_code}")
+            logger.warning("Wikipedia error %s", resp.status_code)
             return IN_STOCK_SEED
 
-        soup = BeautifulSoup(resp.text, "lxml")
-
-        # Find the constituents table
-        tables = soup.find_all("table", class_="wikitable")
+        # Only wikitables; read_html's attrs= would need the class attribute to be
+        # exactly "wikitable", but the constituents table is "wikitable sortable"
+        page = lxml.html.fromstring(resp.content)
+        tables = [
+            pd.read_html(io.StringIO(lxml.html.tostring(table, encoding="unicode")), flavor="lxml")[0]
+            for table in page.xpath(
+                "//table[contains(concat(' ', normalize-space(@class), ' '), ' wikitable ')][.//td]"
+            )
+        ]
+
+        # Find the constituents table: the first wikitable with both a
+        # company-name column and a symbol/ticker column, picked by header
         result = []
-        for table in tables:
-            headers = [th.get_text(strip=True).lower() for th in table.find_all("th")]
-            if any("symbol" in h or "ticker" in h or "company" in h for h in headers):
-                rows = table.find_all("tr")[1:]
-                for row in rows[:limit]:
-                    cols = row.find_all("td")
-                    if len(cols) >= 2:
-                        # Try to extract symbol and name from the columns
-                        symbol = cols[1].get_text(strip=True) if len(cols) > 1 else ""
-                        name = cols[0].get_text(strip=True)
-                        # Clean up — sometimes symbol has .NS suffix
-                        symbol = symbol.replace(".NS", "").replace(".BO", "").strip()
-                        if symbol and name:
-                            result.append({"symbol": symbol, "name": name})
-                if result:
-                    break
+        for df in tables:
+            headers = {str(c).strip().lower(): c for c in df.columns}
+            name_col = next((c for h, c in headers.items() if "company" in h), None)
+            symbol_col = next((c for h, c in headers.items() if "symbol" in h or "ticker" in h), None)
+            if name_col is None or symbol_col is None:
+                continue
+            for name, symbol in zip(df[name_col].iloc[:limit], df[symbol_col].iloc[:limit]):
+                if not isinstance(symbol, str) or not isinstance(name, str):
+                    continue
+                # Clean up — sometimes symbol has .NS suffix
+                symbol = symbol.replace(".NS", "").replace(".BO", "").strip()
+                name = name.strip()
+                if symbol and name:
+                    result.append({"symbol": symbol, "name": name})
+            if result:
+                break
 
         count = len(result)
         if count < 10:
-            print(f"  ? Wikipedia NIFTY 50 scrape returned only {count} stocks, using SEED")
+            logger.warning("Wikipedia NIFTY 50 scrape returned only %d stocks, using SEED", count)
             return IN_STOCK_SEED
 
-        print(f"  ? Fetched {count} Indian stocks")
+        logger.info("Fetched %d Indian stocks", count)
         return result
     except ImportError:
-        print("  ? beautifulsoup4 not installed — using seed Indian stocks")
+        logger.warning("pandas/lxml not installed — using seed Indian stocks")
         return IN_STOCK_SEED
     except Exception as e:
-        print(f"  ? NIFTY 50 scrape exception: {e}")
+        logger.warning("NIFTY 50 scrape exception: %s", e)
         return IN_STOCK_SEED
 
 
@@ -278,6 +390,12 @@ FETCHERS = {
     "in_stock": fetch_top_in_stocks,
 }
 
+SEEDS = {
+    "crypto": CRYPTO_SEED,
+    "us_stock": US_STOCK_SEED,
+    "in_stock": IN_STOCK_SEED,
+}
+
 
 def get_cached_tickers(asset_class: str) -> list[dict]:
     """Get tickers for an asset class (from cache or live API)."""
@@ -293,61 +411,134 @@ def get_cached_tickers(asset_class: str) -> list[dict]:
     if not fetcher:
         return []
 
-    tickers = fetcher()
-    _set_cache(cache_key, tickers)
+    # Single-flight: concurrent misses wait for one fetch instead of all
+    # going to Redis / the upstream API
+    with _fetch_locks.setdefault(cache_key, threading.Lock()):
+        cached = _get_cache(cache_key)
+        if cached:
+            return cached
+        tickers = fetcher()
+        _set_cache(cache_key, tickers)
     return tickers
 
 
 def refresh_all_tickers():
     """Force-refresh all ticker caches. Called by Celery beat or on startup."""
-    for asset_class in ASSET_CLASSES:
-        print(f"  Refreshing {asset_class} tickers...")
-        fetcher = FETCHERS.get(asset_class)
-        if fetcher:
-            tickers = fetcher()
+    # The fetchers are independent HTTP round trips, so run them side by side
+    classes = [cls for cls in ASSET_CLASSES if cls in FETCHERS]
+    with ThreadPoolExecutor(max_workers=len(classes) or 1, thread_name_prefix="tickers") as ex:
+        futures = {}
+        for asset_class in classes:
+            logger.info("Refreshing %s tickers...", asset_class)
+            futures[ex.submit(FETCHERS[asset_class])] = asset_class
+        for fut in as_completed(futures):
+            asset_class = futures[fut]
+            try:
+                tickers = fut.result()
+            except Exception as e:
+                logger.warning("%s ticker refresh failed (%s), using seed", asset_class, e)
+                tickers = SEEDS[asset_class]
             _set_cache(f"tickers:{asset_class}", tickers)
-            print(f"    → {len(tickers)} tickers cached")
+            logger.info("%d %s tickers cached", len(tickers), asset_class)
+
+
+# asset class (None = all) -> (cache version, built at, symbols)
+_all_symbols_cached: dict[str | None, tuple[int, float, list[str]]] = {}
 
 
 def get_all_symbols(asset_class: str | None = None) -> list[str]:
     """Return flat list of all ticker symbols (optionally filtered by class)."""
+    cached = _all_symbols_cached.get(asset_class)
+    if (cached is not None and cached[0] == _cache_version
+            and time.monotonic() - cached[1] <= SYMBOL_INDEX_TTL):
+        return cached[2]
     if asset_class:
-        return [t["symbol"] for t in get_cached_tickers(asset_class)]
-    symbols = []
-    for cls in ASSET_CLASSES:
-        symbols.extend(t["symbol"] for t in get_cached_tickers(cls))
+        symbols = [t["symbol"] for t in get_cached_tickers(asset_class)]
+    else:
+        symbols = []
+        for cls in ASSET_CLASSES:
+            symbols.extend(t["symbol"] for t in get_cached_tickers(cls))
+    _all_symbols_cached[asset_class] = (_cache_version, time.monotonic(), symbols)
     return symbols
 
 
-def get_coingecko_map() -> dict[str, str]:
-    """Return {symbol: coingecko_id} for all cached crypto tickers."""
+# (crypto cache version, built at, {symbol: id}, "id1,id2,...", ((symbol, id), ...))
+_coingecko_cached: tuple[int, float, dict[str, str], str, tuple[tuple[str, str], ...]] | None = None
+
+
+def _coingecko_cache():
+    global _coingecko_cached
+    cached = _coingecko_cached
+    if (cached is not None and cached[0] == _crypto_cache_version
+            and time.monotonic() - cached[1] <= SYMBOL_INDEX_TTL):
+        return cached
     tickers = get_cached_tickers("crypto")
-    return {
+    cg_map = {
         t["symbol"]: t["coingecko_id"]
         for t in tickers
         if "coingecko_id" in t
     }
+    _coingecko_cached = (
+        _crypto_cache_version, time.monotonic(), cg_map,
+        ",".join(cg_map.values()), tuple(cg_map.items()),
+    )
+    return _coingecko_cached
+
+
+def get_coingecko_map() -> dict[str, str]:
+    """Return {symbol: coingecko_id} for all cached crypto tickers."""
+    return _coingecko_cache()[2]
+
+
+def get_coingecko_query() -> tuple[str, tuple[tuple[str, str], ...]]:
+    """Return the comma-joined CoinGecko ids and the (symbol, id) pairs behind them."""
+    _, _, _, ids, items = _coingecko_cache()
+    return ids, items
+
+
+# ─── Symbol index: {symbol: (asset_class, ticker)} for O(1) lookups ───
+# Rebuilt lazily after a local cache write, and at least every
+# SYMBOL_INDEX_TTL seconds to pick up lists refreshed by other processes.
+_SYMBOL_INDEX: dict[str, tuple[str, dict]] = {}
+_symbol_index_version = -1
+_symbol_index_built = 0.0
+
+
+def _rebuild_symbol_index():
+    global _SYMBOL_INDEX, _symbol_index_version, _symbol_index_built
+    index: dict[str, tuple[str, dict]] = {}
+    for cls in ASSET_CLASSES:
+        for t in get_cached_tickers(cls):
+            index.setdefault(t["symbol"], (cls, t))
+    _SYMBOL_INDEX = index
+    _symbol_index_version = _cache_version
+    _symbol_index_built = time.monotonic()
+
+
+def _symbol_index() -> dict[str, tuple[str, dict]]:
+    if (_symbol_index_version != _cache_version
+            or time.monotonic() - _symbol_index_built > SYMBOL_INDEX_TTL):
+        _rebuild_symbol_index()
+    return _SYMBOL_INDEX
 
 
 def get_asset_class(symbol: str) -> str | None:
     """Look up which asset class a symbol belongs to."""
-    for cls in ASSET_CLASSES:
-        symbols = [t["symbol"] for t in get_cached_tickers(cls)]
-        if symbol in symbols:
-            return cls
-    return None
+    entry = _symbol_index().get(symbol)
+    return entry[0] if entry else None
 
 
 def get_ticker_info(symbol: str) -> dict | None:
     """Return full metadata for a symbol."""
-    for cls_key, cls_meta in ASSET_CLASSES.items():
-        for t in get_cached_tickers(cls_key):
-            if t["symbol"] == symbol:
-                return {
-                    "symbol": symbol,
-                    "asset_class": cls_key,
-                    "exchange": cls_meta["exchange"],
-                    "currency": cls_meta["currency"],
-                    **t,
-                }
-    return None
+    entry = _symbol_index().get(symbol)
+    if entry is None:
+        return None
+    cls_key, t = entry
+    cls_meta = ASSET_CLASSES[cls_key]
+    return {
+        "symbol": symbol,
+        "asset_class": cls_key,
+        "exchange": cls_meta["exchange"],
+        "currency": cls_meta["currency"],
+        **t,
+    }
@@ -0,0 +1,18 @@
+"""
+Dependency-free field rules shared by the API schemas and the workers.
+
+Kept out of schemas.py so the workers can pre-check rows without importing
+pydantic models (and, through them, the FastAPI security stack).
+"""
+
+SYMBOL_MAX_LENGTH = 20
+MAX_PRICE = 1_000_000_000  # INR
+ASSET_CLASS_NAMES = ("crypto", "us_stock", "in_stock")
+
+# Symbols are non-empty ASCII letters, digits, "_" and "-". Deleting every allowed byte
+# with bytes.translate (a single C-level pass) leaves nothing for valid input.
+_SYMBOL_CHARS = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_-"
+
+
+def is_valid_symbol(v: str) -> bool:
+    return bool(v) and v.isascii() and not v.encode("ascii").translate(None, _SYMBOL_CHARS)
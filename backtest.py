@@ -1,11 +1,18 @@
+import numpy as np
 import pandas as pd
 import asyncio
 from backend.database import get_db, init_db, AsyncSessionLocal
 from backend.models import MarketPrice
-from sqlalchemy import select
+from sqlalchemy import select, insert
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime, timedelta
-import random
+
+try:
+    import bottleneck as bn
+except ImportError:  # optional: falls back to pandas rolling means
+    bn = None
+
+INSERT_CHUNK = 1000
 
 async def fetch_data(symbol):
     async with AsyncSessionLocal() as session:
@@ -26,18 +33,21 @@ async def populate_mock_data(symbol):
             print("Data already exists.")
             return
 
-        prices = []
-        price = 10000.0
+        # Simulate price movement: hourly +/- 1% random walk for a year
+        n = 365 * 24
         start_time = datetime.utcnow() - timedelta(days=365)
+        rng = np.random.default_rng()
+        changes = rng.uniform(-0.01, 0.01, n)
+        prices = (10000.0 * np.cumprod(1.0 + changes)).tolist()
+        timestamps = pd.date_range(start=start_time, periods=n, freq="h").to_pydatetime()
+        rows = [
+            {"symbol": symbol, "price": price, "timestamp": timestamp}
+            for price, timestamp in zip(prices, timestamps)
+        ]
         
-        # Simulate price movement
-        for i in range(365 * 24): # Hourly data for a year
-            timestamp = start_time + timedelta(hours=i)
-            change_percent = (random.random() - 0.5) * 0.02 # +/- 1%
-            price *= (1 + change_percent)
-            prices.append(MarketPrice(symbol=symbol, price=price, timestamp=timestamp))
-        
-        session.add_all(prices)
+        # Core executemany in chunks instead of tracking 8760 ORM objects
+        for start in range(0, len(rows), INSERT_CHUNK):
+            await session.execute(insert(MarketPrice), rows[start:start + INSERT_CHUNK])
         await session.commit()
     print("Mock data populated.")
 
@@ -56,8 +66,13 @@ async def run_backtest(symbol):
     
     # 2. Strategy: SMA Crossover (Simple Moving Average)
     # Calculate indicators
-    df['SMA_50'] = df['price'].rolling(window=50).mean()
-    df['SMA_200'] = df['price'].rolling(window=200).mean()
+    if bn is not None:
+        arr = df['price'].to_numpy(dtype=np.float64)
+        df['SMA_50'] = bn.move_mean(arr, window=50, min_count=50)
+        df['SMA_200'] = bn.move_mean(arr, window=200, min_count=200)
+    else:
+        df['SMA_50'] = df['price'].rolling(window=50).mean()
+        df['SMA_200'] = df['price'].rolling(window=200).mean()
     
     # Generate Signals
     # 1 = Bullish (Long), -1 = Bearish (Short/Exit), 0 = Neutral
@@ -73,15 +88,18 @@ async def run_backtest(symbol):
     position = 0 # 0: Cash, 1: Long
     trades = []
     
-    # Iterate through dataframe
-    for i in range(1, len(df)):
-        current_signal = df.iloc[i]['Signal']
-        prev_signal = df.iloc[i-1]['Signal'] # Check for crossover
-        price = df.iloc[i]['price']
+    sig = df['Signal'].to_numpy()
+    prices = df['price'].to_numpy()
+
+    # Only rows where the signal changes can trigger a trade
+    crossovers = np.flatnonzero(sig[1:] != sig[:-1]) + 1
+    for i in crossovers:
+        current_signal = sig[i]
+        price = prices[i]
         timestamp = df.index[i]
         
         # Buy Signal (Golden Cross)
-        if current_signal == 1 and prev_signal != 1 and position == 0:
+        if current_signal == 1 and position == 0:
             holdings = cash / price
             cash = 0
             position = 1
@@ -89,7 +107,7 @@ async def run_backtest(symbol):
             # print(f"BUY at {price:.2f} on {timestamp}")
         
         # Sell Signal (Death Cross)
-        elif current_signal == -1 and prev_signal != -1 and position == 1:
+        elif current_signal == -1 and position == 1:
             cash = holdings * price
             holdings = 0
             position = 0
@@ -99,7 +117,7 @@ async def run_backtest(symbol):
     # Final Value
     final_value = cash
     if position == 1:
-        final_value = holdings * df.iloc[-1]['price']
+        final_value = holdings * prices[-1]
         
     print(f"Initial Portfolio: $10000.00")
     print(f"Final Portfolio:   ${final_value:.2f}")
@@ -108,8 +126,8 @@ async def run_backtest(symbol):
     print(f"Total Trades:      {len(trades)}")
     
     # Benchmark (Buy and Hold)
-    start_price = df.iloc[0]['price']
-    end_price = df.iloc[-1]['price']
+    start_price = prices[0]
+    end_price = prices[-1]
     benchmark_roi = ((end_price - start_price) / start_price) * 100
     print(f"Benchmark ROI:     {benchmark_roi:.2f}%")
 
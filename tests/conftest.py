@@ -0,0 +1,30 @@
+"""
+Shared test setup.
+
+The backend reads DATABASE_URL / REDIS_URL at import time, so they are set
+here before any test module imports it: a throwaway SQLite file, and a
+Redis address nothing listens on so every Redis path takes its fallback.
+"""
+
+import os
+import tempfile
+
+_tmpdir = tempfile.mkdtemp(prefix="tradesentient-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_tmpdir, 'test.sqlite')}"
+os.environ["REDIS_URL"] = "redis://127.0.0.1:1"
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    """TestClient with startup run once; ticker lists come from the seeds, not the network."""
+    from fastapi.testclient import TestClient
+    from backend import ticker_config
+    from backend.main import app
+
+    for asset_class, seed in ticker_config.SEEDS.items():
+        ticker_config.FETCHERS[asset_class] = lambda seed=seed: seed
+
+    with TestClient(app) as c:
+        yield c
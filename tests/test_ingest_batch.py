@@ -0,0 +1,54 @@
+"""Tests for POST /ingest/market/batch."""
+
+
+def _row(symbol, price, **extra):
+    return {"symbol": symbol, "price": price, "asset_class": "crypto", "exchange": "global", "currency": "INR", **extra}
+
+
+def test_batch_inserts_all_valid_rows(client):
+    resp = client.post("/ingest/market/batch", json=[_row("BTC", 5_500_000.5, volume=12.0), _row("ETH", 210_000.0)])
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["rejected"] == []
+    assert [r["symbol"] for r in body["inserted"]] == ["BTC", "ETH"]
+    assert all(isinstance(r["id"], int) for r in body["inserted"])
+
+    latest = client.get("/market-data/BTC", params={"limit": 1}).json()
+    assert latest[0]["price"] == 5_500_000.5
+    assert latest[0]["volume"] == 12.0
+
+
+def test_batch_rejects_only_the_bad_rows(client):
+    rows = [
+        _row("SOL", 12_000.0),
+        _row("SHIB", 0.0),                                      # price must be > 0
+        {**_row("M&M", 2_500.0), "asset_class": "in_stock"},   # invalid symbol characters
+        7,                                                      # not an object
+        _row("PEPE", 0.00071),                                  # sub-rupee prices are fine
+    ]
+    resp = client.post("/ingest/market/batch", json=rows)
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert [r["symbol"] for r in body["inserted"]] == ["SOL", "PEPE"]
+    assert body["inserted"][1]["price"] == 0.00071
+    rejected = {r["index"]: r for r in body["rejected"]}
+    assert sorted(rejected) == [1, 2, 3]
+    assert rejected[1]["symbol"] == "SHIB" and "price" in rejected[1]["error"]
+    assert rejected[2]["symbol"] == "M&M" and "symbol" in rejected[2]["error"]
+    assert rejected[3]["symbol"] is None
+
+
+def test_batch_with_no_valid_rows(client):
+    resp = client.post("/ingest/market/batch", json=[_row("BAD SYMBOL", 1.0)])
+
+    assert resp.status_code == 200
+    assert resp.json()["inserted"] == []
+    assert len(resp.json()["rejected"]) == 1
+
+
+def test_batch_body_must_be_a_list(client):
+    resp = client.post("/ingest/market/batch", json=_row("BTC", 1.0))
+
+    assert resp.status_code == 422
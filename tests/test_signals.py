@@ -0,0 +1,112 @@
+"""SignalEngine's ring buffer + running sums must match the original deque/sum() SMA."""
+
+from collections import defaultdict, deque
+
+import numpy as np
+import pytest
+
+from backend.signals import SignalEngine
+
+
+class ReferenceSignalEngine:
+    """The original implementation: recompute both SMAs from a deque on every tick."""
+
+    def __init__(self, short_window: int = 10, long_window: int = 30):
+        self.short_window = short_window
+        self.long_window = long_window
+        self.prices: dict[str, deque] = defaultdict(lambda: deque(maxlen=long_window + 5))
+        self.last_signal: dict[str, int] = defaultdict(int)
+
+    def _sma(self, prices: list[float], window: int) -> float | None:
+        if len(prices) < window:
+            return None
+        return sum(prices[-window:]) / window
+
+    def on_price(self, symbol: str, price: float) -> dict | None:
+        self.prices[symbol].append(price)
+        price_list = list(self.prices[symbol])
+        short_sma = self._sma(price_list, self.short_window)
+        long_sma = self._sma(price_list, self.long_window)
+        if short_sma is None or long_sma is None:
+            return None
+        current = 1 if short_sma > long_sma else -1 if short_sma < long_sma else 0
+        prev = self.last_signal[symbol]
+        self.last_signal[symbol] = current
+        if prev != 0 and current != prev:
+            return {
+                "signal_type": "BUY" if current == 1 else "SELL",
+                "price": round(price, 2),
+                "short_sma": round(short_sma, 2),
+                "long_sma": round(long_sma, 2),
+            }
+        return None
+
+
+def _feed(engine, series: dict[str, list[float]]) -> list[tuple]:
+    """Interleave the symbols tick by tick and collect (tick, symbol, signal)."""
+    signals = []
+    for tick in range(max(len(p) for p in series.values())):
+        for symbol, prices in series.items():
+            if tick < len(prices):
+                signal = engine.on_price(symbol, prices[tick])
+                if signal:
+                    signals.append((tick, symbol, signal))
+    return signals
+
+
+@pytest.mark.parametrize("short_window,long_window", [(10, 30), (3, 7), (1, 4)])
+def test_matches_reference_on_random_walks(short_window, long_window):
+    rng = np.random.default_rng(42)
+    series = {
+        # Large, small and sub-rupee price levels
+        "BTC": (5_500_000 + np.cumsum(rng.normal(0, 20_000, 2_000))).tolist(),
+        "ITC": (440 + np.cumsum(rng.normal(0, 2, 2_000))).tolist(),
+        "SHIB": (0.0015 + np.cumsum(rng.normal(0, 0.00001, 2_000))).tolist(),
+    }
+
+    got = _feed(SignalEngine(short_window, long_window), series)
+    expected = _feed(ReferenceSignalEngine(short_window, long_window), series)
+
+    assert len(got) > 10  # the walks must actually cross
+    assert [(t, s, sig["signal_type"], sig["price"]) for t, s, sig in got] == \
+        [(t, s, sig["signal_type"], sig["price"]) for t, s, sig in expected]
+    for (_, _, a), (_, _, b) in zip(got, expected):
+        assert a["short_sma"] == pytest.approx(b["short_sma"], abs=0.011)
+        assert a["long_sma"] == pytest.approx(b["long_sma"], abs=0.011)
+
+
+def test_running_sums_are_rebuilt_every_window():
+    rng = np.random.default_rng(7)
+    engine = SignalEngine(short_window=5, long_window=20)
+    # Mixed magnitudes make naive add/subtract running sums drift
+    prices = (rng.random(20 * 500) * 10.0 ** rng.integers(-4, 7, 20 * 500)).tolist()
+    for price in prices:
+        engine.on_price("X", price)
+
+    # 10_000 ticks is a whole number of windows, so head has just wrapped
+    assert engine.head["X"] == 0
+    assert engine.long_sum["X"] == sum(prices[-20:])
+    assert engine.short_sum["X"] == sum(prices[-5:])
+
+
+def test_flat_prices_after_a_trend_match_reference():
+    # A flat run makes the SMAs equal (stance 0), which the original reported as SELL
+    prices = [float(p) for p in range(100, 140)] + [150.0] * 40 + [float(p) for p in range(150, 110, -1)]
+
+    got = _feed(SignalEngine(5, 15), {"X": prices})
+    expected = _feed(ReferenceSignalEngine(5, 15), {"X": prices})
+
+    assert [(t, sig["signal_type"]) for t, _, sig in got] == [(t, sig["signal_type"]) for t, _, sig in expected]
+    assert got
+
+
+def test_history_is_oldest_first_and_bounded():
+    engine = SignalEngine(short_window=2, long_window=4)
+    for price in [1.0, 2.0, 3.0]:
+        engine.on_price("X", price)
+    assert engine.history("X").tolist() == [1.0, 2.0, 3.0]
+
+    for price in [4.0, 5.0, 6.0]:
+        engine.on_price("X", price)
+    assert engine.history("X").tolist() == [3.0, 4.0, 5.0, 6.0]
+    assert engine.history("UNKNOWN").size == 0
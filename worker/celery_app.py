@@ -11,12 +11,16 @@ celery_app.conf.update(
     result_serializer="json",
     timezone="UTC",
     enable_utc=True,
+    # Beat tasks are short and frequent: ack on receipt and don't let one
+    # worker process reserve a backlog of them
+    task_acks_late=False,
+    worker_prefetch_multiplier=1,
 )
 
 celery_app.conf.beat_schedule = {
-    # Crypto — every 2 seconds
-    "fetch-crypto-data-every-2s": {
-        "task": "worker.tasks.fetch_crypto_data",
+    # Crypto every 2 seconds + sentiment every ~5 seconds, in one task
+    "fetch-hot-every-2s": {
+        "task": "worker.tasks.fetch_hot_assets",
         "schedule": 2.0,
     },
     # US Stocks — every 5 seconds
@@ -29,11 +33,6 @@ celery_app.conf.beat_schedule = {
         "task": "worker.tasks.fetch_in_stock_data",
         "schedule": 10.0,
     },
-    # Sentiment — every 5 seconds
-    "fetch-sentiment-data-every-5s": {
-        "task": "worker.tasks.fetch_sentiment_data",
-        "schedule": 5.0,
-    },
     # Ticker cache refresh — every 15 minutes
     "refresh-ticker-cache-every-15m": {
         "task": "worker.tasks.refresh_ticker_cache",
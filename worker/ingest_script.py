@@ -1,8 +1,11 @@
-import time
-import requests
-import random
+import asyncio
+import httpx
+import numpy as np
+import orjson
 import os
+import pandas as pd
 import sys
+import time
 
 """
 Standalone ingest script — runs WITHOUT Celery/Redis.
@@ -15,14 +18,83 @@ Usage:
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 from backend.ticker_config import (
-    get_cached_tickers, get_coingecko_map,
+    get_cached_tickers, get_coingecko_query,
     get_all_symbols, ASSET_CLASSES, refresh_all_tickers,
 )
-from backend.forex import convert_to_inr, get_usd_inr_rate
+from backend.forex import get_usd_inr_rate
+from worker.mock_prices import MockRandomWalk
+from worker.payloads import drop_invalid_rows, round_price
 
 API_URL = os.getenv("API_URL", "http://localhost:8000")
 COINGECKO_URL = "https://api.coingecko.com/api/v3"
 
+# Pooled async HTTP/2 clients: one for the ingest API, a separate one for
+# CoinGecko so its shorter timeout doesn't apply to ingest POSTs
+_CLIENT = httpx.AsyncClient(
+    base_url=API_URL,
+    http2=True,
+    timeout=30,
+    limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+)
+_CG_CLIENT = httpx.AsyncClient(base_url=COINGECKO_URL, http2=True, timeout=15)
+
+# Request bodies are pre-encoded with orjson and sent as raw content
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Shared RNG for backoff jitter and mock sentiment picks
+_rng = np.random.default_rng()
+
+MAX_RETRIES = 5
+
+
+class HostLimiter:
+    """
+    Caps in-flight requests to one host and backs off on HTTP 429.
+
+    A 429 (or an exhausted X-RateLimit-Remaining) pauses every caller until
+    the server's Retry-After has passed, falling back to exponential backoff
+    with jitter when the header is missing.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, max_in_flight: int):
+        self.client = client
+        self._sem = asyncio.Semaphore(max_in_flight)
+        self._resume_at = 0.0
+
+    def _pause(self, resp: httpx.Response, attempt: int):
+        try:
+            delay = float(resp.headers["Retry-After"])
+        except (KeyError, ValueError):
+            delay = 2 ** attempt + _rng.random()
+        self._resume_at = max(self._resume_at, time.monotonic() + delay)
+
+    @property
+    def paused(self) -> bool:
+        return time.monotonic() < self._resume_at
+
+    async def request(self, method: str, url: str, retries: int = MAX_RETRIES, **kwargs) -> httpx.Response:
+        """Send a request, retrying up to `retries` attempts in total while the host answers 429."""
+        for attempt in range(retries):
+            wait = self._resume_at - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            async with self._sem:
+                resp = await self.client.request(method, url, **kwargs)
+            if resp.status_code != 429:
+                if resp.headers.get("X-RateLimit-Remaining") == "0":
+                    self._pause(resp, attempt)
+                return resp
+            self._pause(resp, attempt)
+        return resp
+
+
+_API = HostLimiter(_CLIENT, 32)
+_CG = HostLimiter(_CG_CLIENT, 5)  # public tier allows ~30 calls/min
+
+# In-flight fire-and-forget POSTs; holding a reference keeps them from being
+# garbage-collected mid-request, and each one removes itself when done
+_pending: set[asyncio.Task] = set()
+
 # Mock base prices (all INR)
 MOCK_BASE_INR = {
     "BTC": 5_500_000, "ETH": 210_000, "SOL": 12_000, "ADA": 42,
@@ -34,7 +106,13 @@ MOCK_BASE_INR = {
     "ICICIBANK": 1_100, "HINDUNILVR": 2_400, "ITC": 440, "SBIN": 750,
 }
 
-sim_prices = {}
+mock_walk = MockRandomWalk(MOCK_BASE_INR)
+
+# Fields shared by every market row of an asset class
+BASE_PAYLOADS = {
+    cls: {"asset_class": cls, "exchange": meta["exchange"], "currency": "INR"}
+    for cls, meta in ASSET_CLASSES.items()
+}
 
 MOCK_SENTIMENT = [
     ("Bitcoin is going to the moon!", "twitter", 0.9, "BTC"),
@@ -52,31 +130,60 @@ MOCK_SENTIMENT = [
 
 
 def get_mock_inr(symbol):
-    base = MOCK_BASE_INR.get(symbol, 1000)
-    if symbol not in sim_prices:
-        sim_prices[symbol] = base + random.random() * base * 0.01
-    sim_prices[symbol] += (random.random() - 0.5) * base * 0.005
-    return round(sim_prices[symbol], 2)
+    return mock_walk.step([symbol])[symbol]
+
 
+def _spawn(coro):
+    """Run a coroutine in the background without awaiting it."""
+    task = asyncio.create_task(coro)
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
 
-def fetch_crypto_prices_inr():
+
+# CoinGecko's public prices only move every minute or two, so a response is
+# reused for CG_CACHE_TTL seconds: (ids, expires at, prices)
+CG_CACHE_TTL = 45
+_cg_cache: tuple[str, float, dict] | None = None
+
+
+async def fetch_crypto_prices_inr():
     """Fetch crypto prices in INR from CoinGecko."""
-    cg_map = get_coingecko_map()
-    if not cg_map:
+    global _cg_cache
+    ids, cg_items = get_coingecko_query()
+    if not cg_items:
         return None
+    cached = _cg_cache if _cg_cache is not None and _cg_cache[0] == ids else None
+    if cached is not None and time.monotonic() < cached[1]:
+        return cached[2]
+    # Never wait out a CoinGecko backoff here: it would stall every asset
+    # class in the tick loop. Serve the last prices (or none) instead.
+    if _CG.paused:
+        return cached[2] if cached is not None else None
     try:
-        ids = ",".join(list(cg_map.values())[:50])
-        resp = requests.get(
-            f"{COINGECKO_URL}/simple/price",
-            params={"ids": ids, "vs_currencies": "inr", "include_24hr_vol": "true"},
-            timeout=15,
+        resp = await _CG.request(
+            "GET", "/simple/price",
+            params={"ids": ids, "vs_currencies": "inr"},  # volume isn't used here
+            retries=1,
         )
+        if resp.status_code == 429 and cached is not None:
+            # Rate limited: keep serving the last prices until CoinGecko
+            # says we may ask again
+            try:
+                retry_after = float(resp.headers["Retry-After"])
+            except (KeyError, ValueError):
+                retry_after = CG_CACHE_TTL
+            _cg_cache = (ids, time.monotonic() + retry_after, cached[2])
+            return cached[2]
         resp.raise_for_status()
-        data = resp.json()
+        data = orjson.loads(resp.content)
         prices = {}
-        for symbol, cg_id in cg_map.items():
-            if cg_id in data and "inr" in data[cg_id]:
-                prices[symbol] = data[cg_id]["inr"]
+        for symbol, cg_id in cg_items:
+            entry = data.get(cg_id)
+            inr = entry.get("inr") if entry else None
+            if inr is not None:
+                prices[symbol] = inr
+        if prices:
+            _cg_cache = (ids, time.monotonic() + CG_CACHE_TTL, prices)
         return prices if prices else None
     except Exception as e:
         print(f"  ⚠ CoinGecko error: {e}")
@@ -90,19 +197,24 @@ def fetch_us_prices_inr():
         symbols = get_all_symbols("us_stock")[:20]  # Limit batch size
         if not symbols:
             return None
-        data = yf.download(" ".join(symbols), period="1d", interval="1m", progress=False)
-        if data.empty:
+        data = yf.download(
+            " ".join(symbols), period="1d", interval="1m",
+            progress=False, threads=True, group_by="ticker",
+        )
+        if data is None or data.empty:
             return None
-        prices = {}
-        for sym in symbols:
-            try:
-                if len(symbols) == 1:
-                    usd = float(data["Close"].iloc[-1])
-                else:
-                    usd = float(data["Close"][sym].iloc[-1])
-                prices[sym] = convert_to_inr(usd)
-            except Exception:
-                continue
+        if isinstance(data.columns, pd.MultiIndex):
+            closes = data.xs("Close", axis=1, level=1)
+        else:  # single symbol: plain OHLCV columns
+            closes = data[["Close"]].set_axis(symbols[:1], axis=1)
+        # Last non-NaN close of every ticker at once, converted with one FX lookup
+        last_close = closes.ffill().iloc[-1].to_numpy(dtype=float)
+        inr = np.round(last_close * get_usd_inr_rate(), 2)
+        prices = {
+            sym: price
+            for sym, price, ok in zip(closes.columns, inr.tolist(), (~np.isnan(last_close)).tolist())
+            if ok
+        }
         return prices or None
     except ImportError:
         return None
@@ -111,13 +223,52 @@ def fetch_us_prices_inr():
         return None
 
 
-def ingest_loop():
+async def post_market_batch(batch):
+    """POST one tick's market rows and report each one."""
+    batch, dropped = drop_invalid_rows(batch)
+    lines = [f"  ✗ {sym:<10} skipped (invalid symbol or price)" for sym in dropped]
+    if not batch:
+        sys.stdout.write("\n".join(lines) + "\n")
+        return
+    try:
+        r = await _API.request("POST", "/ingest/market/batch", content=orjson.dumps(batch), headers=_JSON_HEADERS)
+        rejected = set()
+        if r.status_code == 200:
+            rejected = {rej["index"] for rej in orjson.loads(r.content)["rejected"]}
+        # One write for the whole batch rather than a print per row
+        lines += [
+            f"  {'✓' if r.status_code == 200 and i not in rejected else '✗'} "
+            f"{row['symbol']:<10} ₹{row['price']:>14,.2f}  ({row['asset_class']})"
+            for i, row in enumerate(batch)
+        ]
+        if r.status_code != 200:
+            lines.append(f"  ✗ batch: {r.text[:100]}")
+        sys.stdout.write("\n".join(lines) + "\n")
+    except Exception as e:
+        print(f"  ✗ batch of {len(batch)}: {e}")
+
+
+async def post_sentiment():
+    """POST one random mock sentiment item."""
+    text, source, score, symbol = MOCK_SENTIMENT[_rng.integers(len(MOCK_SENTIMENT))]
+    try:
+        await _API.request(
+            "POST", "/ingest/sentiment",
+            content=orjson.dumps({"source": source, "sentiment_score": score, "raw_text": text, "symbol": symbol}),
+            headers=_JSON_HEADERS,
+        )
+        print(f"  💬 [{source}] {text[:55]}...")
+    except Exception as e:
+        print(f"  ✗ sentiment: {e}")
+
+
+async def ingest_loop():
     # Refresh tickers on startup
     print("  Refreshing ticker caches...")
-    refresh_all_tickers()
+    await asyncio.to_thread(refresh_all_tickers)
 
     # Print header
-    rate = get_usd_inr_rate()
+    rate = await asyncio.to_thread(get_usd_inr_rate)
     total = sum(len(get_cached_tickers(c)) for c in ASSET_CLASSES)
 
     print()
@@ -150,82 +301,61 @@ def ingest_loop():
         tick += 1
         print(f"── Tick #{tick} ─────────────────────────────────")
 
+        # All market rows for this tick go to the API in one batch POST
+        batch = []
+
         # ──────── CRYPTO (every tick) ────────
         if tick % 5 == 1:
-            real_crypto = fetch_crypto_prices_inr()
+            real_crypto = await fetch_crypto_prices_inr()
             if real_crypto:
                 real_crypto_cache = real_crypto
 
         crypto_syms = get_all_symbols("crypto")[:15]  # Ingest top 15 per tick
+        mock = mock_walk.step(crypto_syms)
+        base = BASE_PAYLOADS["crypto"]
         for sym in crypto_syms:
-            price = real_crypto_cache.get(sym, get_mock_inr(sym))
+            price = real_crypto_cache.get(sym, mock[sym])
             if isinstance(price, dict):
-                price = price.get("inr", get_mock_inr(sym))
-            payload = {
-                "symbol": sym, "price": round(price, 2),
-                "asset_class": "crypto", "exchange": "global", "currency": "INR",
-            }
-            try:
-                r = requests.post(f"{API_URL}/ingest/market", json=payload, timeout=30)
-                s = "✓" if r.status_code == 200 else "✗"
-                print(f"  {s} {sym:<10} ₹{price:>14,.2f}  (crypto)")
-            except Exception as e:
-                print(f"  ✗ {sym}: {e}")
+                price = price.get("inr", mock[sym])
+            batch.append({**base, "symbol": sym, "price": round_price(price)})
 
         # ──────── US STOCKS (every 3rd tick) ────────
         if tick % 3 == 0:
-            us_real = fetch_us_prices_inr()
+            us_real = await asyncio.to_thread(fetch_us_prices_inr)
             us_syms = get_all_symbols("us_stock")[:15]
+            mock = mock_walk.step(us_syms)
+            base = BASE_PAYLOADS["us_stock"]
             for sym in us_syms:
-                price = us_real.get(sym, get_mock_inr(sym)) if us_real else get_mock_inr(sym)
-                payload = {
-                    "symbol": sym, "price": round(price, 2),
-                    "asset_class": "us_stock", "exchange": "NASDAQ/NYSE", "currency": "INR",
-                }
-                try:
-                    r = requests.post(f"{API_URL}/ingest/market", json=payload, timeout=30)
-                    s = "✓" if r.status_code == 200 else "✗"
-                    print(f"  {s} {sym:<10} ₹{price:>14,.2f}  (us_stock)")
-                except Exception as e:
-                    print(f"  ✗ {sym}: {e}")
+                price = us_real.get(sym, mock[sym]) if us_real else mock[sym]
+                batch.append({**base, "symbol": sym, "price": round_price(price)})
 
         # ──────── INDIAN STOCKS (every 5th tick) ────────
         if tick % 5 == 0:
             in_syms = get_all_symbols("in_stock")[:15]
+            mock = mock_walk.step(in_syms)
+            base = BASE_PAYLOADS["in_stock"]
             for sym in in_syms:
-                price = get_mock_inr(sym)
-                payload = {
-                    "symbol": sym, "price": round(price, 2),
-                    "asset_class": "in_stock", "exchange": "NSE", "currency": "INR",
-                }
-                try:
-                    r = requests.post(f"{API_URL}/ingest/market", json=payload, timeout=30)
-                    s = "✓" if r.status_code == 200 else "✗"
-                    print(f"  {s} {sym:<10} ₹{price:>14,.2f}  (in_stock)")
-                except Exception as e:
-                    print(f"  ✗ {sym}: {e}")
+                price = mock[sym]
+                batch.append({**base, "symbol": sym, "price": round_price(price)})
+
+        # POSTs run in the background so the next tick isn't held up by them
+        if batch:
+            _spawn(post_market_batch(batch))
 
         # ──────── SENTIMENT (every 3rd tick) ────────
         if tick % 3 == 0:
-            text, source, score, symbol = random.choice(MOCK_SENTIMENT)
-            try:
-                requests.post(
-                    f"{API_URL}/ingest/sentiment",
-                    json={"source": source, "sentiment_score": score, "raw_text": text, "symbol": symbol},
-                    timeout=30,
-                )
-                print(f"  💬 [{source}] {text[:55]}...")
-            except Exception as e:
-                print(f"  ✗ sentiment: {e}")
+            _spawn(post_sentiment())
 
         # ──────── TICKER REFRESH (every 450 ticks ≈ 15 min) ────
         if tick % 450 == 0:
             print("  🔄 Refreshing ticker caches...")
-            refresh_all_tickers()
+            await asyncio.to_thread(refresh_all_tickers)
 
         print()
-        time.sleep(2)
+        await asyncio.sleep(2)
 
 
 if __name__ == "__main__":
-    ingest_loop()
+    import logging
+    logging.basicConfig(level=logging.INFO, format="  %(message)s")
+    asyncio.run(ingest_loop())
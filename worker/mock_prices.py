@@ -0,0 +1,39 @@
+"""
+Vectorized random-walk mock prices (INR) for when live APIs are unavailable.
+
+Each symbol starts within 1% above its base price and moves by up to
+±0.25% of base per step. Prices live in one NumPy array, so a whole tick's
+symbols are advanced with a single RNG draw.
+"""
+
+import numpy as np
+
+
+class MockRandomWalk:
+    def __init__(self, base_prices: dict[str, float], default_base: float = 1000):
+        self._base_prices = base_prices
+        self._default_base = default_base
+        self._rng = np.random.default_rng()
+        self._index: dict[str, int] = {}
+        self._base = np.empty(0, dtype=np.float64)
+        self._prices = np.empty(0, dtype=np.float64)
+
+    def _add_symbols(self, symbols: list[str]):
+        new = [s for s in dict.fromkeys(symbols) if s not in self._index]
+        if not new:
+            return
+        base = np.array([self._base_prices.get(s, self._default_base) for s in new], dtype=np.float64)
+        start = base + self._rng.random(len(new)) * base * 0.01
+        for sym in new:
+            self._index[sym] = len(self._index)
+        self._base = np.concatenate((self._base, base))
+        self._prices = np.concatenate((self._prices, start))
+
+    def step(self, symbols: list[str]) -> dict[str, float]:
+        """Advance the given symbols one step and return {symbol: price}."""
+        if not symbols:
+            return {}
+        self._add_symbols(symbols)
+        idx = np.fromiter((self._index[s] for s in symbols), dtype=np.intp, count=len(symbols))
+        self._prices[idx] += (self._rng.random(len(idx)) - 0.5) * self._base[idx] * 0.005
+        return dict(zip(symbols, np.round(self._prices[idx], 2).tolist()))
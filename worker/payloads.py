@@ -0,0 +1,46 @@
+"""
+Client-side preparation of market rows for /ingest/market/batch.
+
+The API validates each row against MarketPriceCreate and drops the ones
+that fail, so rows that can never be accepted (non-positive prices,
+symbols like "M&M") are filtered out here before they are sent. The checks
+use backend.validators, which has no dependencies, so the workers don't
+need the API stack installed.
+"""
+
+import math
+
+from backend.validators import ASSET_CLASS_NAMES, MAX_PRICE, SYMBOL_MAX_LENGTH, is_valid_symbol
+
+
+def round_price(price: float) -> float:
+    """Round to paise; sub-rupee prices (SHIB, PEPE, ...) keep 6 significant digits instead of becoming 0."""
+    if abs(price) >= 1:
+        return round(price, 2)
+    return float(f"{price:.6g}")
+
+
+def _is_number(v) -> bool:
+    return type(v) in (int, float) and math.isfinite(v)
+
+
+def is_valid_row(row: dict) -> bool:
+    """Same symbol / price / volume / asset class rules as MarketPriceCreate."""
+    symbol, price, volume = row.get("symbol"), row.get("price"), row.get("volume")
+    return (
+        isinstance(symbol, str) and len(symbol.strip()) <= SYMBOL_MAX_LENGTH and is_valid_symbol(symbol.strip())
+        and _is_number(price) and 0 < price <= MAX_PRICE
+        and (volume is None or (_is_number(volume) and volume >= 0))
+        and row.get("asset_class") in (None, *ASSET_CLASS_NAMES)
+    )
+
+
+def drop_invalid_rows(rows: list[dict]) -> tuple[list[dict], list[str]]:
+    """Split rows into (ingestable rows, symbols of the rows the API would reject)."""
+    valid, dropped = [], []
+    for row in rows:
+        if is_valid_row(row):
+            valid.append(row)
+        else:
+            dropped.append(str(row.get("symbol")))
+    return valid, dropped
@@ -1,47 +1,89 @@
+from celery import group
 from worker.celery_app import celery_app
-import requests
-import random
+import httpx
+import numpy as np
+import orjson
+import pandas as pd
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 from backend.ticker_config import (
-    get_cached_tickers, get_coingecko_map,
+    get_cached_tickers, get_coingecko_query,
     get_all_symbols, ASSET_CLASSES, refresh_all_tickers,
 )
-from backend.forex import convert_to_inr, get_usd_inr_rate
+from backend.forex import get_usd_inr_rate
+from worker.mock_prices import MockRandomWalk
+from worker.payloads import drop_invalid_rows, round_price
 
 API_URL = os.getenv("API_URL", "http://localhost:8000")
 COINGECKO_URL = "https://api.coingecko.com/api/v3"
 
+# Pooled HTTP/2 clients: one for the ingest API, a separate one for
+# CoinGecko so its shorter timeout doesn't apply to ingest POSTs
+_CLIENT = httpx.Client(
+    base_url=API_URL,
+    http2=True,
+    timeout=30,
+    limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+)
+_CG_CLIENT = httpx.Client(base_url=COINGECKO_URL, http2=True, timeout=15)
+
+# Request bodies are pre-encoded with orjson and sent as raw content
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# fetch_hot_assets cadence (matches its beat entry) and sentiment's own cadence
+HOT_INTERVAL = 2.0
+SENTIMENT_INTERVAL = 5.0
+
 
 # ═══════════════════════════════════════════════════════
 #  CoinGecko — Crypto prices in INR (no conversion needed)
 # ═══════════════════════════════════════════════════════
 
+# CoinGecko's public prices only move every minute or two, so a response is
+# reused for CG_CACHE_TTL seconds: (ids, expires at, prices)
+CG_CACHE_TTL = 45
+_cg_cache: tuple[str, float, dict] | None = None
+
+
 def fetch_crypto_prices_inr() -> dict | None:
     """Fetch crypto prices in INR directly from CoinGecko."""
-    cg_map = get_coingecko_map()
-    if not cg_map:
+    global _cg_cache
+    # CoinGecko allows up to 250 ids per request
+    ids, cg_items = get_coingecko_query()
+    if not cg_items:
         return None
+    cached = _cg_cache if _cg_cache is not None and _cg_cache[0] == ids else None
+    if cached is not None and time.monotonic() < cached[1]:
+        return cached[2]
     try:
-        # CoinGecko allows up to 250 ids per request
-        ids = ",".join(cg_map.values())
-        resp = requests.get(
-            f"{COINGECKO_URL}/simple/price",
+        resp = _CG_CLIENT.get(
+            "/simple/price",
             params={"ids": ids, "vs_currencies": "inr", "include_24hr_vol": "true"},
-            timeout=15,
         )
+        if resp.status_code == 429 and cached is not None:
+            # Rate limited: keep serving the last prices until CoinGecko
+            # says we may ask again
+            try:
+                retry_after = float(resp.headers["Retry-After"])
+            except (KeyError, ValueError):
+                retry_after = CG_CACHE_TTL
+            _cg_cache = (ids, time.monotonic() + retry_after, cached[2])
+            return cached[2]
         resp.raise_for_status()
-        data = resp.json()
+        data = orjson.loads(resp.content)
 
         prices = {}
-        for symbol, cg_id in cg_map.items():
-            if cg_id in data and "inr" in data[cg_id]:
-                prices[symbol] = {
-                    "price": round(data[cg_id]["inr"], 2),
-                    "volume": data[cg_id].get("inr_24h_vol"),
-                }
+        for symbol, cg_id in cg_items:
+            entry = data.get(cg_id)
+            inr = entry.get("inr") if entry else None
+            if inr is not None:
+                prices[symbol] = {"price": round_price(inr), "volume": entry.get("inr_24h_vol")}
+        if prices:
+            _cg_cache = (ids, time.monotonic() + CG_CACHE_TTL, prices)
         return prices if prices else None
     except Exception as e:
         print(f"  ⚠ CoinGecko error: {e}")
@@ -61,31 +103,32 @@ def fetch_us_stock_prices_inr() -> dict | None:
         if not symbols:
             return None
 
-        # Process in batches of 10 to avoid timeouts
-        prices = {}
-        for i in range(0, len(symbols), 10):
-            batch = symbols[i:i + 10]
-            tickers_str = " ".join(batch)
-            try:
-                data = yf.download(tickers_str, period="1d", interval="1m", progress=False)
-                if data.empty:
-                    continue
-                for sym in batch:
-                    try:
-                        if len(batch) == 1:
-                            usd_price = float(data["Close"].iloc[-1])
-                            vol = float(data["Volume"].iloc[-1])
-                        else:
-                            usd_price = float(data["Close"][sym].iloc[-1])
-                            vol = float(data["Volume"][sym].iloc[-1])
-                        inr_price = convert_to_inr(usd_price)
-                        prices[sym] = {"price": inr_price, "volume": vol}
-                    except Exception:
-                        continue
-            except Exception as e:
-                print(f"  ⚠ yfinance batch error: {e}")
-                continue
-
+        # One download for every symbol; yfinance fans out internally (threads=True)
+        data = yf.download(
+            " ".join(symbols), period="1d", interval="1m",
+            progress=False, threads=True, group_by="ticker",
+        )
+        if data is None or data.empty:
+            return None
+        if isinstance(data.columns, pd.MultiIndex):
+            closes = data.xs("Close", axis=1, level=1)
+            volumes = data.xs("Volume", axis=1, level=1)[closes.columns]
+        else:  # single symbol: plain OHLCV columns
+            closes = data[["Close"]].set_axis(symbols[:1], axis=1)
+            volumes = data[["Volume"]].set_axis(symbols[:1], axis=1)
+
+        # Last non-NaN close/volume of every symbol in one pass, then one
+        # FX multiply for the whole batch
+        last_close = closes.ffill().iloc[-1].to_numpy(dtype=float)
+        last_vol = volumes.ffill().iloc[-1].to_numpy(dtype=float)
+        inr = np.round(last_close * get_usd_inr_rate(), 2)
+        valid = ~(np.isnan(last_close) | np.isnan(last_vol))
+
+        prices = {
+            sym: {"price": price, "volume": vol}
+            for sym, price, vol, ok in zip(closes.columns, inr.tolist(), last_vol.tolist(), valid.tolist())
+            if ok
+        }
         return prices if prices else None
     except ImportError:
         print("  ⚠ yfinance not installed")
@@ -99,8 +142,11 @@ def fetch_us_stock_prices_inr() -> dict | None:
 #  Indian Stocks — already in INR
 # ═══════════════════════════════════════════════════════
 
+NSE_MAX_WORKERS = 8  # keep concurrent NSE requests polite
+
+
 def fetch_indian_stock_prices_inr() -> dict | None:
-    """Fetch NSE stock prices (already in INR)."""
+    """Fetch NSE stock prices (already INR)."""
     try:
         from jugaad_data.nse import stock_df
         from datetime import date, timedelta
@@ -112,17 +158,25 @@ def fetch_indian_stock_prices_inr() -> dict | None:
         today = date.today()
         start = today - timedelta(days=5)
 
-        prices = {}
-        for sym in symbols:
+        def _fetch_one(sym: str) -> tuple[str, dict | None]:
             try:
                 df = stock_df(symbol=sym, from_date=start, to_date=today)
-                if not df.empty:
-                    last_close = float(df["CLOSE"].iloc[-1])
-                    volume = float(df["TOTAL TRADE QUANTITY"].iloc[-1]) if "TOTAL TRADE QUANTITY" in df.columns else None
-                    prices[sym] = {"price": round(last_close, 2), "volume": volume}
+                if df.empty:
+                    return sym, None
+                last_close = float(df["CLOSE"].iloc[-1])
+                volume = float(df["TOTAL TRADE QUANTITY"].iloc[-1]) if "TOTAL TRADE QUANTITY" in df.columns else None
+                return sym, {"price": round(last_close, 2), "volume": volume}
             except Exception as e:
                 print(f"  ⚠ NSE {sym}: {e}")
-                continue
+                return sym, None
+
+        # stock_df is blocking HTTP, so fan the symbols out over a thread pool
+        prices = {}
+        with ThreadPoolExecutor(max_workers=NSE_MAX_WORKERS) as ex:
+            for fut in as_completed([ex.submit(_fetch_one, sym) for sym in symbols]):
+                sym, data = fut.result()
+                if data:
+                    prices[sym] = data
 
         return prices if prices else None
     except ImportError:
@@ -151,16 +205,18 @@ MOCK_BASE_INR = {
     "BHARTIARTL": 1_500, "KOTAKBANK": 1_800,
 }
 
-_sim_prices = {}
+_mock_walk = MockRandomWalk(MOCK_BASE_INR)
+_rng = np.random.default_rng()  # for mock sentiment picks
+
+
+def get_mock_prices_inr(symbols: list[str]) -> dict[str, dict]:
+    """Random walk mock prices in INR for a whole batch of symbols."""
+    return {sym: {"price": price, "volume": None} for sym, price in _mock_walk.step(symbols).items()}
 
 
 def get_mock_price_inr(symbol: str) -> dict:
     """Random walk mock price in INR."""
-    base = MOCK_BASE_INR.get(symbol, 1000)
-    if symbol not in _sim_prices:
-        _sim_prices[symbol] = base + random.random() * base * 0.01
-    _sim_prices[symbol] += (random.random() - 0.5) * base * 0.005
-    return {"price": round(_sim_prices[symbol], 2), "volume": None}
+    return get_mock_prices_inr([symbol])[symbol]
 
 
 MOCK_SENTIMENT = [
@@ -187,24 +243,26 @@ MOCK_SENTIMENT = [
 # ═══════════════════════════════════════════════════════
 
 def _ingest_prices(prices: dict, asset_class: str):
-    """Post price data (in INR) to the backend API."""
-    exchange = ASSET_CLASSES[asset_class]["exchange"]
-
-    for symbol, data in prices.items():
-        payload = {
-            "symbol": symbol,
-            "price": data["price"],
-            "asset_class": asset_class,
-            "exchange": exchange,
-            "currency": "INR",
-            "volume": data.get("volume"),
-        }
-        try:
-            response = requests.post(f"{API_URL}/ingest/market", json=payload, timeout=30)
-            if response.status_code != 200:
-                print(f"  ✗ {symbol}: {response.text[:100]}")
-        except Exception as e:
-            print(f"  ✗ {symbol}: {e}")
+    """Post price data (in INR) to the backend API as one batch."""
+    base = {"asset_class": asset_class, "exchange": ASSET_CLASSES[asset_class]["exchange"], "currency": "INR"}
+    payloads, dropped = drop_invalid_rows([
+        {**base, "symbol": symbol, "price": data["price"], "volume": data.get("volume")}
+        for symbol, data in prices.items()
+    ])
+    if dropped:
+        print(f"  ✗ {asset_class}: skipped {len(dropped)} invalid rows: {', '.join(dropped)}")
+    if not payloads:
+        return
+    try:
+        response = _CLIENT.post("/ingest/market/batch", content=orjson.dumps(payloads), headers=_JSON_HEADERS)
+        if response.status_code != 200:
+            print(f"  ✗ {asset_class} batch ({len(payloads)}): {response.text[:100]}")
+        else:
+            rejected = orjson.loads(response.content)["rejected"]
+            if rejected:
+                print(f"  ✗ {asset_class} batch: {len(rejected)} rows rejected: {rejected[:3]}")
+    except Exception as e:
+        print(f"  ✗ {asset_class} batch ({len(payloads)}): {e}")
 
 
 @celery_app.task
@@ -215,7 +273,7 @@ def fetch_crypto_data():
         _ingest_prices(prices, "crypto")
     else:
         symbols = get_all_symbols("crypto")[:20]  # Limit mock to 20
-        mock = {sym: get_mock_price_inr(sym) for sym in symbols}
+        mock = get_mock_prices_inr(symbols)
         _ingest_prices(mock, "crypto")
 
 
@@ -227,7 +285,7 @@ def fetch_us_stock_data():
         _ingest_prices(prices, "us_stock")
     else:
         symbols = get_all_symbols("us_stock")[:20]
-        mock = {sym: get_mock_price_inr(sym) for sym in symbols}
+        mock = get_mock_prices_inr(symbols)
         _ingest_prices(mock, "us_stock")
 
 
@@ -239,24 +297,35 @@ def fetch_in_stock_data():
         _ingest_prices(prices, "in_stock")
     else:
         symbols = get_all_symbols("in_stock")[:20]
-        mock = {sym: get_mock_price_inr(sym) for sym in symbols}
+        mock = get_mock_prices_inr(symbols)
         _ingest_prices(mock, "in_stock")
 
 
 @celery_app.task
 def fetch_sentiment_data():
     """Ingest sentiment data."""
-    text, source, score, symbol = random.choice(MOCK_SENTIMENT)
+    text, source, score, symbol = MOCK_SENTIMENT[_rng.integers(len(MOCK_SENTIMENT))]
     try:
-        requests.post(
-            f"{API_URL}/ingest/sentiment",
-            json={"source": source, "sentiment_score": score, "raw_text": text, "symbol": symbol},
+        _CLIENT.post(
+            "/ingest/sentiment",
+            content=orjson.dumps({"source": source, "sentiment_score": score, "raw_text": text, "symbol": symbol}),
+            headers=_JSON_HEADERS,
             timeout=5,
         )
     except Exception as e:
         print(f"  ✗ sentiment: {e}")
 
 
+@celery_app.task(ignore_result=True)
+def fetch_hot_assets():
+    """Crypto prices every tick plus sentiment every ~5s, as one beat task."""
+    fetch_crypto_data()
+    # Stateless across worker processes: a HOT_INTERVAL tick falls in the
+    # first HOT_INTERVAL seconds of each SENTIMENT_INTERVAL slot about once
+    if time.time() % SENTIMENT_INTERVAL < HOT_INTERVAL:
+        fetch_sentiment_data()
+
+
 @celery_app.task
 def refresh_ticker_cache():
     """Periodic task to refresh ticker caches from APIs."""
@@ -266,6 +335,5 @@ def refresh_ticker_cache():
 # Legacy compatibility
 @celery_app.task
 def fetch_market_data():
-    fetch_crypto_data()
-    fetch_us_stock_data()
-    fetch_in_stock_data()
+    # Independent fetches: dispatch them as a group so workers run them in parallel
+    group(fetch_crypto_data.s(), fetch_us_stock_data.s(), fetch_in_stock_data.s()).apply_async()